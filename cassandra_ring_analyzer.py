@@ -5,18 +5,25 @@ Analyzes and visualizes Cassandra token ring distribution with gap detection.
 """
 
 import argparse
+import contextlib
+import mmap
 import sys
 import re
-from typing import List, Dict, Tuple, Optional
+from typing import List, Dict, Tuple, Optional, Iterable, BinaryIO, TYPE_CHECKING
 from dataclasses import dataclass
-import matplotlib.pyplot as plt
-import matplotlib.patches as mpatches
 import numpy as np
+from numba_utils import compute_range_sizes, mean_std
+
+if TYPE_CHECKING:
+    # matplotlib is imported lazily so parsing and --stats-only runs skip it
+    import matplotlib.pyplot as plt
 
 
 @dataclass
 class TokenEntry:
     """Represents a single token entry from the ring file."""
+    __slots__ = ('address', 'rack', 'status', 'state', 'load', 'owns', 'token')
+    
     address: str
     rack: str
     status: str
@@ -39,99 +46,110 @@ class TokenRange:
 class RingParser:
     """Parses Cassandra nodetool ring output files."""
     
-    def __init__(self, filepath: str):
+    # Address, rack, status, state, load value, load unit, owns, token;
+    # anything after the token column is ignored. Matched on raw bytes so
+    # only the matched columns get decoded
+    _LINE_RE = re.compile(rb'\s*(\S+)\s+(\S+)\s+(\S+)\s+(\S+)\s+(\S+)\s+(\S+)\s+(\S+)\s+(\S+)')
+    
+    def __init__(self, filepath: str, verbose: bool = False):
         self.filepath = filepath
         self.datacenter = None
+        self.verbose = verbose
+        self.warnings: List[Tuple[int, str]] = []  # (line number, raw line)
     
     def parse_file(self) -> List[TokenEntry]:
-        """Parse the ring file and return list of token entries."""
+        """
+        Parse the ring file and return list of token entries.
+        
+        Raises:
+            FileNotFoundError: If the ring file does not exist
+            ValueError: If the file has no 'Address' header or no valid tokens
+        """
         tokens = []
+        self.warnings = []
+        in_data = False  # Header section until the "Address" header line
         
         try:
-            with open(self.filepath, 'r') as f:
-                lines = f.readlines()
-        except FileNotFoundError:
-            print(f"Error: File '{self.filepath}' not found.")
-            sys.exit(1)
-        except Exception as e:
-            print(f"Error reading file: {e}")
-            sys.exit(1)
-        
-        # Find datacenter
-        for line in lines:
-            if line.strip().startswith('Datacenter:'):
-                self.datacenter = line.split(':')[1].strip()
-                break
-        
-        # Find where data starts (after "Address" header line)
-        data_start = 0
-        for i, line in enumerate(lines):
-            if line.strip().startswith('Address'):
-                data_start = i + 1
-                break
-        
-        if data_start == 0:
-            print("Error: Could not find 'Address' header in ring file.")
-            sys.exit(1)
-        
-        # Parse token lines
-        for line_num, line in enumerate(lines[data_start:], start=data_start + 1):
-            line = line.strip()
-            if not line:
-                continue
-            
-            # Split by whitespace
-            parts = line.split()
-            
-            # Handle orphaned token (line with only token, no address)
-            if len(parts) == 1:
-                try:
-                    token_value = int(parts[0])
-                    # Skip orphaned tokens - they don't have an owner
-                    continue
-                except ValueError:
-                    continue
-            
-            # Normal token line should have at least 7 parts
-            if len(parts) >= 7:
-                try:
-                    # Handle load which might be "1.46 TiB" (2 parts)
-                    address = parts[0]
-                    rack = parts[1]
-                    status = parts[2]
-                    state = parts[3]
-                    
-                    # Load is parts[4] and parts[5] combined
-                    load = f"{parts[4]} {parts[5]}"
-                    owns = parts[6]
-                    
-                    # Token is the last part
-                    if len(parts) >= 8:
-                        token = int(parts[7])
-                    else:
+            with open(self.filepath, 'rb') as f, self._map_file(f) as mm:
+                lines = f if mm is None else iter(mm.readline, b'')
+                for line_num, line in enumerate(lines, start=1):
+                    if in_data:
+                        token_entry = self._parse_token_line(line, line_num)
+                        if token_entry is not None:
+                            tokens.append(token_entry)
                         continue
                     
-                    token_entry = TokenEntry(
-                        address=address,
-                        rack=rack,
-                        status=status,
-                        state=state,
-                        load=load,
-                        owns=owns,
-                        token=token
-                    )
-                    tokens.append(token_entry)
-                    
-                except (ValueError, IndexError) as e:
-                    print(f"Warning: Skipping malformed line {line_num}: {line}")
-                    continue
+                    # Find datacenter and where data starts
+                    line = line.strip()
+                    if line.startswith(b'Datacenter:'):
+                        if self.datacenter is None:
+                            self.datacenter = line.split(b':')[1].strip().decode()
+                    elif line.startswith(b'Address'):
+                        in_data = True
+        except FileNotFoundError:
+            raise FileNotFoundError(f"Ring file '{self.filepath}' not found")
+        except OSError as e:
+            raise OSError(f"Error reading file: {e}") from e
+        
+        # Malformed lines are reported once here rather than per line
+        if self.warnings:
+            self._report_warnings()
+        
+        if not in_data:
+            raise ValueError("Could not find 'Address' header in ring file")
         
         if not tokens:
-            print("Error: No valid tokens found in ring file.")
-            sys.exit(1)
+            raise ValueError("No valid tokens found in ring file")
         
         print(f"Parsed {len(tokens)} tokens from datacenter '{self.datacenter}'")
         return tokens
+    
+    @staticmethod
+    def _map_file(f: BinaryIO):
+        """Map the file read-only, or return a null context if it can't be mapped."""
+        try:
+            return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (ValueError, OSError):
+            # Empty files and pipes can't be mapped; they are read directly
+            return contextlib.nullcontext()
+    
+    def _parse_token_line(self, line: bytes, line_num: int) -> Optional[TokenEntry]:
+        """Parse a single raw data line, returning None if it holds no token."""
+        # Orphaned tokens (line with only token, no address) and other short
+        # lines don't match - they don't have an owner
+        match = self._LINE_RE.match(line)
+        if match is None:
+            return None
+        
+        # Decode just the matched columns, in one call
+        address, rack, status, state, load_value, load_unit, owns, token_str = \
+            match.group(0).decode().split()
+        
+        try:
+            token = int(token_str)
+        except ValueError:
+            self.warnings.append((line_num, line.decode(errors='replace')))
+            return None
+        
+        return TokenEntry(
+            address=sys.intern(address),  # One shared string per node, across files too
+            rack=rack,
+            status=status,
+            state=state,
+            load=f"{load_value} {load_unit}",  # Load like "1.46 TiB" spans two columns
+            owns=owns,
+            token=token
+        )
+    
+    def _report_warnings(self):
+        """Write collected malformed-line warnings to stderr in one go."""
+        if self.verbose:
+            message = '\n'.join(f"Warning: Skipping malformed line {line_num}: {line.strip()}"
+                                for line_num, line in self.warnings)
+        else:
+            message = (f"Warning: Skipped {len(self.warnings)} malformed line(s) "
+                       f"(use --verbose for details)")
+        sys.stderr.write(message + '\n')
 
 
 class TokenAnalyzer:
@@ -143,39 +161,81 @@ class TokenAnalyzer:
     
     def __init__(self, tokens: List[TokenEntry]):
         self.tokens = tokens
-        self.sorted_tokens = sorted(tokens, key=lambda t: t.token)
+        
+        # Structure-of-arrays view of the tokens: values sorted with NumPy's
+        # argsort, owners encoded as indices into the sorted node list
+        raw_tokens = np.fromiter((t.token for t in tokens), dtype=np.int64, count=len(tokens))
+        order = np.argsort(raw_tokens, kind='stable')
+        nodes, owner_ids = np.unique(np.array([t.address for t in tokens], dtype=str),
+                                     return_inverse=True)
+        
+        owner_ids = owner_ids.reshape(-1)
+        
+        self.sorted_tokens = [tokens[i] for i in order.tolist()]
+        self.tokens_np = raw_tokens[order]
+        self.owner_ids = owner_ids[order].astype(np.int32)
+        self._input_owner_ids = owner_ids  # Owners in input (file) order
+        self.nodes = nodes.tolist()
+        self.node_index = {node: i for i, node in enumerate(self.nodes)}
+        
+        # Each node's tokens as a sorted array, indexed by owner id; built
+        # once so gap checks can binary search a single owner's tokens
+        by_owner = np.argsort(self.owner_ids, kind='stable')
+        bounds = np.cumsum(np.bincount(self.owner_ids, minlength=len(self.nodes)))[:-1]
+        self._tokens_by_owner = np.split(self.tokens_np[by_owner], bounds)
+        
+        # Structure-of-arrays view of the ranges, filled by calculate_ranges()
+        self.range_starts = None
+        self.range_ends = None
+        self.range_sizes = None
     
     def calculate_ranges(self) -> List[TokenRange]:
         """Calculate token ranges between consecutive tokens."""
-        ranges = []
-        n = len(self.sorted_tokens)
-        
-        for i in range(n):
-            current = self.sorted_tokens[i]
-            next_idx = (i + 1) % n  # Wrap around for last token
-            next_token = self.sorted_tokens[next_idx]
-            
-            # Calculate range size
-            size = self._calculate_range_size(current.token, next_token.token)
-            
-            token_range = TokenRange(
-                start_token=current.token,
-                end_token=next_token.token,
-                owner=next_token.address,  # Range is owned by the endpoint
-                size=size,
-                is_gap=False
-            )
-            ranges.append(token_range)
+        starts, ends, sizes, owners = self._range_arrays()
         
-        return ranges
+        return [
+            TokenRange(start_token=start, end_token=end, owner=owner, size=size, is_gap=False)
+            for start, end, owner, size in zip(starts.tolist(), ends.tolist(),
+                                               owners, sizes.tolist())
+        ]
     
-    def _calculate_range_size(self, start: int, end: int) -> int:
-        """Calculate range size handling wrap-around."""
-        if end >= start:
-            return end - start
-        else:
-            # Wrap-around case
-            return (self.TOKEN_SPACE + end - start) % self.TOKEN_SPACE
+    def calculate_ranges_with_gaps(self) -> List[TokenRange]:
+        """
+        Calculate token ranges with gaps already flagged.
+        Equivalent to detect_gaps(calculate_ranges()), but gaps are found on
+        the range arrays, so the TokenRange list is built in a single pass.
+        """
+        starts, ends, sizes, owners = self._range_arrays()
+        
+        is_gap = [False] * len(owners)
+        if owners:
+            for i in np.flatnonzero(sizes > self._gap_threshold()).tolist():
+                if not self._has_intermediate_tokens(int(starts[i]), int(ends[i]), owners[i]):
+                    is_gap[i] = True
+        
+        return [
+            TokenRange(start_token=start, end_token=end, owner=owner, size=size, is_gap=gap)
+            for start, end, owner, size, gap in zip(starts.tolist(), ends.tolist(),
+                                                    owners, sizes.tolist(), is_gap)
+        ]
+    
+    def _range_arrays(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray, List[str]]:
+        """Compute and store range starts, ends and sizes, plus each range's owner."""
+        starts = self.tokens_np
+        ends = np.roll(starts, -1)  # Wrap around for last token
+        
+        # Sizes wrap modulo 2**64, which yields the ring distance for the
+        # wrap-around range as well
+        sizes = compute_range_sizes(starts)
+        
+        self.range_starts = starts
+        self.range_ends = ends
+        self.range_sizes = sizes
+        
+        # Range is owned by the endpoint
+        owners = [t.address for t in self.sorted_tokens[1:] + self.sorted_tokens[:1]]
+        
+        return starts, ends, sizes, owners
     
     def detect_gaps(self, ranges: List[TokenRange]) -> List[TokenRange]:
         """
@@ -183,46 +243,54 @@ class TokenAnalyzer:
         A gap is identified when consecutive tokens from the same node
         create an unusually large range.
         """
-        # Group tokens by owner
-        tokens_by_owner = {}
-        for token in self.tokens:
-            if token.address not in tokens_by_owner:
-                tokens_by_owner[token.address] = []
-            tokens_by_owner[token.address].append(token.token)
+        if not ranges:
+            return ranges
+        
+        sizes = np.fromiter((r.size for r in ranges), dtype=np.uint64, count=len(ranges))
+        
+        # Mark potential gaps
+        for i in np.flatnonzero(sizes > self._gap_threshold()):
+            range_obj = ranges[i]
+            # If no intermediate tokens and range is large, it's likely a gap
+            if not self._has_intermediate_tokens(range_obj.start_token, range_obj.end_token,
+                                                 range_obj.owner):
+                range_obj.is_gap = True
         
+        return ranges
+    
+    def _gap_threshold(self) -> np.uint64:
+        """Range size above which a range is a gap candidate."""
         # Calculate average range size for reference
         avg_range_size = self.TOKEN_SPACE / len(self.tokens)
         gap_threshold = avg_range_size * 2  # Ranges 2x larger than average might be gaps
         
-        # Mark potential gaps
-        for range_obj in ranges:
-            # Check if this range is significantly larger than average
-            if range_obj.size > gap_threshold:
-                # Check if there are tokens from other nodes that should be in this range
-                has_intermediate_tokens = False
-                for owner, owner_tokens in tokens_by_owner.items():
-                    if owner == range_obj.owner:
-                        continue
-                    for token in owner_tokens:
-                        if self._is_token_in_range(token, range_obj.start_token, range_obj.end_token):
-                            has_intermediate_tokens = True
-                            break
-                    if has_intermediate_tokens:
-                        break
-                
-                # If no intermediate tokens and range is large, it's likely a gap
-                if not has_intermediate_tokens:
-                    range_obj.is_gap = True
+        # Integer threshold keeps the comparison exact on the uint64 sizes
+        return np.uint64(min(int(gap_threshold), self.TOKEN_SPACE - 1))
+    
+    def _has_intermediate_tokens(self, start: int, end: int, owner: str) -> bool:
+        """
+        Check if tokens from nodes other than owner lie strictly between
+        start and end, handling wrap-around.
+        """
+        interior = self._count_between(self.tokens_np, start, end)
         
-        return ranges
+        owner_id = self.node_index.get(owner)
+        if owner_id is None:
+            return interior > 0
+        
+        # Any interior token the owner doesn't hold belongs to another node
+        return interior > self._count_between(self._tokens_by_owner[owner_id], start, end)
     
-    def _is_token_in_range(self, token: int, start: int, end: int) -> bool:
-        """Check if token is between start and end, handling wrap-around."""
-        if end >= start:
-            return start < token < end
-        else:
-            # Wrap-around case
-            return token > start or token < end
+    @staticmethod
+    def _count_between(sorted_tokens: np.ndarray, start: int, end: int) -> int:
+        """Count tokens strictly between start and end, handling wrap-around."""
+        # Binary search the sorted token array for the interior slice
+        lo = int(np.searchsorted(sorted_tokens, start, side='right'))
+        hi = int(np.searchsorted(sorted_tokens, end, side='left'))
+        
+        # A wrap-around range (end < start) runs from lo past the end of the
+        # array back to hi, so it also counts the n tokens of a full pass
+        return max(hi - lo + len(sorted_tokens) * (end < start), 0)
     
     def calculate_statistics(self, ranges: List[TokenRange]) -> Dict:
         """Calculate comprehensive statistics about the ring."""
@@ -236,35 +304,48 @@ class TokenAnalyzer:
             'balance_score': 0.0,
             'largest_gap': 0,
             'smallest_range': float('inf'),
-            'average_range': 0
+            'average_range': 0,
+            'total_coverage': 0.0
+        }
+        
+        # Per-node statistics; nodes are keyed in order of first appearance
+        # and take their load from that first token line
+        _, first_seen, token_counts = np.unique(self._input_owner_ids, return_index=True,
+                                                return_counts=True)
+        stats['nodes'] = {
+            self.nodes[i]: {
+                'token_count': int(token_counts[i]),
+                'load': self.tokens[first_seen[i]].load,
+                'total_range_size': 0,
+                'coverage_percentage': 0.0
+            }
+            for i in np.argsort(first_seen, kind='stable').tolist()
         }
         
-        # Per-node statistics
-        for token in self.tokens:
-            node = token.address
-            if node not in stats['nodes']:
-                stats['nodes'][node] = {
-                    'token_count': 0,
-                    'load': token.load,
-                    'total_range_size': 0,
-                    'coverage_percentage': 0.0
-                }
-            stats['nodes'][node]['token_count'] += 1
+        # Sorted once here for every legend/report consumer
+        stats['nodes_sorted'] = list(self.nodes)
         
         # Range statistics
-        gap_space = 0
-        range_sizes = []
-        
-        for range_obj in ranges:
-            if range_obj.is_gap:
-                stats['gap_count'] += 1
-                gap_space += range_obj.size
-                stats['largest_gap'] = max(stats['largest_gap'], range_obj.size)
-            else:
-                owner = range_obj.owner
-                stats['nodes'][owner]['total_range_size'] += range_obj.size
-                range_sizes.append(range_obj.size)
-                stats['smallest_range'] = min(stats['smallest_range'], range_obj.size)
+        n_ranges = len(ranges)
+        sizes = np.fromiter((r.size for r in ranges), dtype=np.uint64, count=n_ranges)
+        gap_mask = np.fromiter((r.is_gap for r in ranges), dtype=bool, count=n_ranges)
+        owner_ids = np.fromiter((self.node_index[r.owner] for r in ranges if not r.is_gap),
+                                dtype=np.intp)
+        
+        gap_sizes = sizes[gap_mask]
+        owned_sizes = sizes[~gap_mask]
+        
+        stats['gap_count'] = len(gap_sizes)
+        gap_space = int(gap_sizes.sum())
+        if len(gap_sizes):
+            stats['largest_gap'] = int(gap_sizes.max())
+        if len(owned_sizes):
+            stats['smallest_range'] = int(owned_sizes.min())
+        
+        # Per-node owned space in a single reduction
+        node_spaces = self._sum_by_owner(owner_ids, owned_sizes, len(self.nodes))
+        for node, node_space in zip(self.nodes, node_spaces):
+            stats['nodes'][node]['total_range_size'] = node_space
         
         # Calculate percentages
         stats['gap_percentage'] = (gap_space / self.TOKEN_SPACE) * 100
@@ -273,21 +354,34 @@ class TokenAnalyzer:
             node_space = stats['nodes'][node]['total_range_size']
             stats['nodes'][node]['coverage_percentage'] = (node_space / self.TOKEN_SPACE) * 100
         
-        # Calculate average range
-        if range_sizes:
-            stats['average_range'] = sum(range_sizes) / len(range_sizes)
+        # Owned share of the ring, from the exact integer node spaces
+        stats['total_coverage'] = (sum(node_spaces) / self.TOKEN_SPACE) * 100
+        
+        # Calculate average range, exactly from the integer owned space; the
+        # spread comes from a single pass over the sizes
+        if len(owned_sizes):
+            stats['average_range'] = sum(node_spaces) / len(owned_sizes)
+            _, std_dev = mean_std(owned_sizes)
         
         # Balance score (coefficient of variation - lower is better)
-        if range_sizes and len(range_sizes) > 1:
+        if len(owned_sizes) > 1:
             mean_size = stats['average_range']
-            variance = sum((x - mean_size)**2 for x in range_sizes) / len(range_sizes)
-            std_dev = variance ** 0.5
-            cv = std_dev / mean_size if mean_size > 0 else 0
+            cv = float(std_dev) / mean_size if mean_size > 0 else 0
             stats['balance_score'] = max(0, 1.0 - cv)  # Convert to 0-1 scale where 1 is perfect
         else:
             stats['balance_score'] = 1.0
         
         return stats
+    
+    @staticmethod
+    def _sum_by_owner(owner_ids: np.ndarray, sizes: np.ndarray, n_owners: int) -> List[int]:
+        """
+        Sum uint64 range sizes per owner id with np.bincount.
+        Sizes are split into 32-bit halves so the float64 sums stay exact.
+        """
+        low = np.bincount(owner_ids, weights=sizes & np.uint64(0xFFFFFFFF), minlength=n_owners)
+        high = np.bincount(owner_ids, weights=sizes >> np.uint64(32), minlength=n_owners)
+        return [(int(h) << 32) + int(l) for h, l in zip(high.tolist(), low.tolist())]
 
 
 class RingVisualizer:
@@ -297,19 +391,34 @@ class RingVisualizer:
     MIN_TOKEN = -(2**63)
     MAX_TOKEN = 2**63 - 1
     
+    # tab10/tab20 colors, filled on first use so matplotlib stays lazy
+    _PALETTE10: Optional[Tuple[Tuple[float, float, float], ...]] = None
+    _PALETTE20: Optional[Tuple[Tuple[float, float, float], ...]] = None
+    
     def __init__(self):
         self.color_map = {}
     
-    def assign_colors(self, nodes: List[str]) -> Dict[str, Tuple[float, float, float]]:
-        """Assign distinct colors to each node."""
-        unique_nodes = sorted(set(nodes))
+    @classmethod
+    def _load_palettes(cls):
+        """Cache the qualitative colormaps as plain RGB tuples."""
+        import matplotlib.pyplot as plt
+        
+        cls._PALETTE10 = tuple(plt.cm.tab10.colors)
+        cls._PALETTE20 = tuple(plt.cm.tab20.colors)
+    
+    def assign_colors(self, nodes: Iterable[str]) -> Dict[str, Tuple[float, float, float]]:
+        """Assign distinct colors to each node, given the unique node addresses."""
+        if self._PALETTE10 is None:
+            self._load_palettes()
+        
+        unique_nodes = sorted(nodes)
         n_nodes = len(unique_nodes)
         
         # Choose colormap based on number of nodes
         if n_nodes <= 10:
-            colors = plt.cm.tab10.colors
+            colors = self._PALETTE10
         else:
-            colors = plt.cm.tab20.colors
+            colors = self._PALETTE20
         
         color_map = {}
         for i, node in enumerate(unique_nodes):
@@ -329,55 +438,63 @@ class RingVisualizer:
         angle = normalized * 360
         return angle
     
+    def tokens_to_angles(self, token_values) -> np.ndarray:
+        """Convert an array of token values to angles in degrees (0-360)."""
+        tokens = np.asarray(token_values, dtype=np.float64)
+        return (tokens - self.MIN_TOKEN) * (360.0 / (self.MAX_TOKEN - self.MIN_TOKEN))
+    
     def create_ring_plot(self, ranges: List[TokenRange], stats: Dict, 
-                        figsize: Tuple[int, int] = (14, 12)) -> plt.Figure:
+                        figsize: Tuple[int, int] = (14, 12)) -> 'plt.Figure':
         """Create circular ring plot with colored segments."""
+        import matplotlib.pyplot as plt
+        import matplotlib.colors as mcolors
+        import matplotlib.patches as mpatches
+        from matplotlib.collections import PatchCollection
         
         fig = plt.figure(figsize=figsize)
-        ax = fig.add_subplot(111, projection='polar')
-        
-        # Configure polar plot
-        ax.set_theta_zero_location('N')  # 0° at top
-        ax.set_theta_direction(-1)  # Clockwise
-        ax.set_ylim(0, 1)
-        ax.set_yticks([])
-        ax.set_xticks([])
-        ax.spines['polar'].set_visible(False)
-        
-        # Draw each range as a wedge
-        for range_obj in ranges:
-            start_angle = self.token_to_angle(range_obj.start_token)
-            end_angle = self.token_to_angle(range_obj.end_token)
-            
-            # Handle wrap-around
-            if end_angle < start_angle:
-                end_angle += 360
-            
-            # Convert to radians for matplotlib
-            start_rad = np.deg2rad(start_angle)
-            end_rad = np.deg2rad(end_angle)
-            
-            # Get color
-            if range_obj.is_gap:
-                color = self.color_map['GAP']
-                alpha = 0.5
-                edgecolor = 'red'
-                linewidth = 2
-            else:
-                color = self.color_map[range_obj.owner]
-                alpha = 0.8
-                edgecolor = 'black'
-                linewidth = 0.5
-            
-            # Create wedge using theta (angle) values
-            theta = np.linspace(start_rad, end_rad, 100)
-            r_inner = 0.6
-            r_outer = 1.0
-            
-            # Fill the wedge
-            ax.fill_between(theta, r_inner, r_outer, 
-                           color=color, alpha=alpha, 
-                           edgecolor=edgecolor, linewidth=linewidth)
+        ax = fig.add_subplot(111)
+        
+        # Wedges are drawn on a plain Cartesian axes; an analytic Wedge is
+        # much cheaper to render than polar fill_between over sampled theta
+        ax.set_aspect('equal')
+        ax.set_xlim(-1.02, 1.02)
+        ax.set_ylim(-1.02, 1.02)
+        ax.axis('off')
+        
+        r_inner = 0.6
+        r_outer = 1.0
+        
+        # Compute all range angles at once
+        start_angles = self.tokens_to_angles([r.start_token for r in ranges])
+        end_angles = self.tokens_to_angles([r.end_token for r in ranges])
+        
+        # Handle wrap-around
+        end_angles = np.where(end_angles < start_angles, end_angles + 360, end_angles)
+        
+        # Per-range style, selected by the gap mask in one pass
+        is_gap = np.fromiter((r.is_gap for r in ranges), dtype=bool, count=len(ranges))
+        gap_mask = is_gap[:, None]
+        owner_rgb = np.array([self.color_map[r.owner] for r in ranges],
+                             dtype=np.float64).reshape(-1, 3)
+        face_rgb = np.where(gap_mask, self.color_map['GAP'], owner_rgb)
+        edge_rgb = np.where(gap_mask, mcolors.to_rgb('red'), mcolors.to_rgb('black'))
+        alphas = np.where(is_gap, 0.5, 0.8)[:, None]
+        linewidths = np.where(is_gap, 2.0, 0.5)
+        
+        # Ring angles run clockwise from 0° at top; Wedge angles run
+        # counter-clockwise from the positive x axis
+        wedges = [
+            mpatches.Wedge((0, 0), r_outer, 90 - end_angle, 90 - start_angle,
+                           width=r_outer - r_inner)
+            for start_angle, end_angle in zip(start_angles.tolist(), end_angles.tolist())
+        ]
+        
+        # Draw all wedges as a single collection
+        collection = PatchCollection(wedges)
+        collection.set_facecolors(np.hstack([face_rgb, alphas]))
+        collection.set_edgecolors(np.hstack([edge_rgb, alphas]))
+        collection.set_linewidths(linewidths)
+        ax.add_collection(collection)
         
         # Add title
         title = f"Cassandra Token Ring Distribution\nDatacenter: {stats.get('datacenter', 'Unknown')}"
@@ -388,12 +505,14 @@ class RingVisualizer:
         
         return fig
     
-    def _add_legend(self, fig: plt.Figure, stats: Dict):
+    def _add_legend(self, fig: 'plt.Figure', stats: Dict):
         """Add legend with node information and statistics."""
+        import matplotlib.patches as mpatches
+        
         legend_elements = []
         
         # Add node entries
-        for node in sorted(stats['nodes'].keys()):
+        for node in stats['nodes_sorted']:
             node_stats = stats['nodes'][node]
             color = self.color_map[node]
             token_count = node_stats['token_count']
@@ -439,14 +558,13 @@ def print_statistics(stats: Dict):
     print(f"Total Tokens: {stats['total_tokens']}")
     
     print("\nNode Distribution:")
-    for node in sorted(stats['nodes'].keys()):
+    for node in stats['nodes_sorted']:
         node_stats = stats['nodes'][node]
         print(f"  {node}: {node_stats['token_count']} tokens "
               f"({node_stats['coverage_percentage']:.2f}%) - Load: {node_stats['load']}")
     
     print("\nToken Space Coverage:")
-    total_coverage = sum(n['coverage_percentage'] for n in stats['nodes'].values())
-    print(f"  Owned: {total_coverage:.2f}%")
+    print(f"  Owned: {stats['total_coverage']:.2f}%")
     print(f"  Gaps: {stats['gap_percentage']:.2f}% ({stats['gap_count']} gaps detected)")
     
     if stats['gap_count'] > 0:
@@ -460,13 +578,10 @@ def print_statistics(stats: Dict):
 
 def parse_size(size_str: str) -> Tuple[int, int]:
     """Parse size string like '12x10' into tuple (12, 10)."""
-    try:
-        parts = size_str.lower().split('x')
-        if len(parts) == 2:
-            return (int(parts[0]), int(parts[1]))
-    except:
-        pass
-    return (12, 10)  # Default
+    match = re.fullmatch(r'(\d+)x(\d+)', size_str.strip().lower())
+    if match is None:
+        return (12, 10)  # Default
+    return (int(match.group(1)), int(match.group(2)))
 
 
 def main():
@@ -483,7 +598,7 @@ def main():
                        help='Output format (default: png)')
     parser.add_argument('--dpi', type=int, default=300,
                        help='Image resolution (default: 300)')
-    parser.add_argument('--size', default='14x12',
+    parser.add_argument('--size', type=parse_size, default=(14, 12),
                        help='Figure size in inches WxH (default: 14x12)')
     parser.add_argument('--show', action='store_true',
                        help='Display plot interactively')
@@ -498,8 +613,12 @@ def main():
     if args.verbose:
         print(f"Parsing ring file: {args.ring_file}")
     
-    ring_parser = RingParser(args.ring_file)
-    tokens = ring_parser.parse_file()
+    ring_parser = RingParser(args.ring_file, verbose=args.verbose)
+    try:
+        tokens = ring_parser.parse_file()
+    except (OSError, ValueError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
     
     # Calculate ranges
     if args.verbose:
@@ -527,13 +646,13 @@ def main():
             print("Generating visualization...")
         
         visualizer = RingVisualizer()
-        visualizer.assign_colors([t.address for t in tokens])
+        visualizer.assign_colors(stats['nodes'].keys())
         
-        figsize = parse_size(args.size)
-        fig = visualizer.create_ring_plot(ranges, stats, figsize=figsize)
+        fig = visualizer.create_ring_plot(ranges, stats, figsize=args.size)
         
         # Save or show
         if args.show:
+            import matplotlib.pyplot as plt
             plt.show()
         
         # Always save unless only showing
@@ -541,8 +660,14 @@ def main():
         if not output_file.endswith(f'.{args.format}'):
             output_file = f"{output_file.rsplit('.', 1)[0]}.{args.format}"
         
+        # PNG encoding dominates save time at high DPI; zlib level 1 is
+        # still lossless and much faster than the default level
+        save_kwargs = {}
+        if args.format == 'png':
+            save_kwargs['pil_kwargs'] = {'compress_level': 1}
+        
         fig.savefig(output_file, format=args.format, dpi=args.dpi, 
-                   bbox_inches='tight', facecolor='white')
+                   bbox_inches='tight', facecolor='white', **save_kwargs)
         print(f"Visualization saved to: {output_file}")
     
     return 0
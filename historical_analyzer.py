@@ -4,17 +4,46 @@ Historical Ring Analyzer
 Compare multiple ring snapshots over time to track changes and trends.
 """
 
-from typing import List, Dict, Tuple, Optional
+import bisect
+import sys
+from typing import List, Dict, Tuple, Optional, TYPE_CHECKING
 from dataclasses import dataclass, field
-from datetime import datetime
+from datetime import datetime, timedelta
+from concurrent.futures import ProcessPoolExecutor
 import json
-import matplotlib.pyplot as plt
-import matplotlib.patches as mpatches
 import numpy as np
 from cassandra_ring_analyzer import TokenEntry, TokenRange, RingParser, TokenAnalyzer
 
+if TYPE_CHECKING:
+    # matplotlib is imported lazily so comparison/export-only use skips it
+    import matplotlib.pyplot as plt
 
-@dataclass
+try:
+    import orjson
+    HAVE_ORJSON = True
+except ImportError:
+    HAVE_ORJSON = False
+
+
+# dataclass(slots=True) needs Python 3.10; older versions keep a __dict__
+_DATACLASS_SLOTS = {'slots': True} if sys.version_info >= (3, 10) else {}
+
+# Trend labels indexed by direction + 1 (direction is -1, 0 or 1)
+_DIR = ('decreasing', 'stable', 'increasing')
+_BAL = ('degrading', 'stable', 'improving')
+
+
+def _trend_direction(values) -> int:
+    """Direction of change from the first to the last value: -1, 0 or 1 (0 for NaN)."""
+    delta = values[-1] - values[0]
+    if delta > 0:
+        return 1
+    if delta < 0:
+        return -1
+    return 0
+
+
+@dataclass(**_DATACLASS_SLOTS)
 class RingSnapshot:
     """Represents a ring state at a specific point in time."""
     timestamp: datetime
@@ -23,25 +52,72 @@ class RingSnapshot:
     tokens: List[TokenEntry] = field(default_factory=list)
     ranges: List[TokenRange] = field(default_factory=list)
     stats: Dict = field(default_factory=dict)
+    address_counts: Dict[str, int] = field(default_factory=dict)  # Tokens per node
+    node_set: frozenset = field(default_factory=frozenset)
+    label: str = ""  # Timestamp formatted for plot axes
     
     def __post_init__(self):
-        """Parse and analyze the ring file."""
-        parser = RingParser(self.filepath)
-        self.tokens = parser.parse_file()
-        self.datacenter = parser.datacenter
-        
-        analyzer = TokenAnalyzer(self.tokens)
-        self.ranges = analyzer.calculate_ranges()
-        self.ranges = analyzer.detect_gaps(self.ranges)
-        self.stats = analyzer.calculate_statistics(self.ranges)
-        self.stats['datacenter'] = self.datacenter
+        """Parse and analyze the ring file, unless the results were supplied."""
+        if not self.tokens:
+            parser = RingParser(self.filepath)
+            self.tokens = parser.parse_file()
+            self.datacenter = parser.datacenter
+        # Group addresses in one NumPy pass rather than hashing per token
+        addresses, counts = np.unique(np.array([t.address for t in self.tokens], dtype=str),
+                                      return_counts=True)
+        self.address_counts = dict(zip(addresses.tolist(), counts.tolist()))
+        self.node_set = frozenset(self.address_counts)
+        self.label = self.timestamp.strftime('%Y-%m-%d %H:%M')
+        
+        if not self.ranges or not self.stats:
+            analyzer = TokenAnalyzer(self.tokens)
+            if not self.ranges:
+                self.ranges = analyzer.calculate_ranges_with_gaps()
+            if not self.stats:
+                self.stats = analyzer.calculate_statistics(self.ranges)
+                self.stats['datacenter'] = self.datacenter
+
+
+def _json_default(obj):
+    """Encode the datetime values of a comparison for JSON export."""
+    if isinstance(obj, datetime):
+        return obj.isoformat()  # orjson handles these natively
+    if isinstance(obj, timedelta):
+        return str(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def _build_snapshot(args: Tuple[str, datetime]) -> RingSnapshot:
+    """Parse and analyze one ring file; module level so worker processes can pickle it."""
+    filepath, timestamp = args
+    return RingSnapshot(timestamp=timestamp, filepath=filepath, datacenter="")
 
 
 class HistoricalAnalyzer:
     """Analyzes changes in ring topology over time."""
     
+    # Per-snapshot record used to build the trend series
+    _TREND_DTYPE = np.dtype([
+        ('tokens', np.int64),
+        ('nodes', np.int64),
+        ('balance', np.float64),
+        ('gaps', np.int64),
+        ('gap_pct', np.float64)
+    ])
+    
     def __init__(self):
         self.snapshots: List[RingSnapshot] = []
+        
+        # compare_snapshots() results keyed by (idx1, idx2, version); the
+        # version changes whenever snapshots are added, since that can
+        # shift indices
+        self._cmp_cache: Dict[Tuple[int, int, int], Dict] = {}
+        self._version = 0
+    
+    def _snapshots_changed(self):
+        """Invalidate cached comparisons after the snapshot list changes."""
+        self._version += 1
+        self._cmp_cache.clear()
     
     def add_snapshot(self, filepath: str, timestamp: Optional[datetime] = None):
         """
@@ -60,11 +136,47 @@ class HistoricalAnalyzer:
             datacenter=""  # Will be set during parsing
         )
         
-        self.snapshots.append(snapshot)
-        self.snapshots.sort(key=lambda s: s.timestamp)
+        # Keep snapshots in timestamp order; insort lands after equal
+        # timestamps, just as a stable sort of the appended list would
+        if sys.version_info >= (3, 10):
+            bisect.insort(self.snapshots, snapshot, key=lambda s: s.timestamp)
+        else:
+            self.snapshots.append(snapshot)
+            if len(self.snapshots) > 1 and timestamp < self.snapshots[-2].timestamp:
+                self.snapshots.sort(key=lambda s: s.timestamp)
+        self._snapshots_changed()
         
         print(f"Added snapshot from {filepath} at {timestamp}")
     
+    def add_snapshots(self, filepaths: List[str], timestamps: Optional[List[datetime]] = None,
+                      max_workers: Optional[int] = None):
+        """
+        Add several ring snapshots, parsing and analyzing them in parallel.
+        
+        Args:
+            filepaths: Paths to ring files
+            timestamps: Timestamp per file (defaults to now)
+            max_workers: Worker process count (defaults to the CPU count)
+        """
+        if timestamps is None:
+            timestamps = [datetime.now()] * len(filepaths)
+        jobs = list(zip(filepaths, timestamps))
+        
+        # Each file is independent, CPU-bound work; a single file isn't
+        # worth the process start-up cost
+        if len(jobs) < 2 or max_workers == 1:
+            snapshots = [_build_snapshot(job) for job in jobs]
+        else:
+            with ProcessPoolExecutor(max_workers=max_workers) as executor:
+                snapshots = list(executor.map(_build_snapshot, jobs))
+        
+        self.snapshots.extend(snapshots)
+        self.snapshots.sort(key=lambda s: s.timestamp)
+        self._snapshots_changed()
+        
+        for filepath, timestamp in jobs:
+            print(f"Added snapshot from {filepath} at {timestamp}")
+    
     def compare_snapshots(self, idx1: int, idx2: int) -> Dict:
         """
         Compare two snapshots and identify changes.
@@ -74,34 +186,45 @@ class HistoricalAnalyzer:
             idx2: Index of second snapshot
             
         Returns:
-            Dictionary containing comparison results
+            Dictionary containing comparison results (cached and shared
+            between calls, so treat it as read-only)
         """
         if idx1 >= len(self.snapshots) or idx2 >= len(self.snapshots):
             raise IndexError("Snapshot index out of range")
         
+        cache_key = (idx1, idx2, self._version)
+        cached = self._cmp_cache.get(cache_key)
+        if cached is not None:
+            return cached
+        
         snap1 = self.snapshots[idx1]
         snap2 = self.snapshots[idx2]
         
-        # Extract node sets
-        nodes1 = set(t.address for t in snap1.tokens)
-        nodes2 = set(t.address for t in snap2.tokens)
+        # Node sets are cached on each snapshot
+        nodes1 = snap1.node_set
+        nodes2 = snap2.node_set
         
         # Identify changes
         added_nodes = nodes2 - nodes1
         removed_nodes = nodes1 - nodes2
         common_nodes = nodes1 & nodes2
         
-        # Token changes per node
-        token_changes = {}
-        for node in common_nodes:
-            tokens1 = len([t for t in snap1.tokens if t.address == node])
-            tokens2 = len([t for t in snap2.tokens if t.address == node])
-            if tokens1 != tokens2:
-                token_changes[node] = {
-                    'before': tokens1,
-                    'after': tokens2,
-                    'change': tokens2 - tokens1
-                }
+        # Token changes per node, diffed as aligned count arrays; only nodes
+        # whose count changed get an entry, in address order
+        common = sorted(common_nodes)
+        before = np.fromiter((snap1.address_counts[n] for n in common), dtype=np.int64,
+                             count=len(common))
+        after = np.fromiter((snap2.address_counts[n] for n in common), dtype=np.int64,
+                            count=len(common))
+        delta = after - before
+        token_changes = {
+            common[i]: {
+                'before': int(before[i]),
+                'after': int(after[i]),
+                'change': int(delta[i])
+            }
+            for i in np.flatnonzero(delta).tolist()
+        }
         
         # Balance score change
         balance_change = snap2.stats['balance_score'] - snap1.stats['balance_score']
@@ -129,6 +252,7 @@ class HistoricalAnalyzer:
             'gap_pct_change': gap_pct_change
         }
         
+        self._cmp_cache[cache_key] = comparison
         return comparison
     
     def detect_trends(self) -> Dict:
@@ -141,32 +265,45 @@ class HistoricalAnalyzer:
         if len(self.snapshots) < 2:
             return {'error': 'Need at least 2 snapshots for trend analysis'}
         
+        # One pass over the snapshots fills a structured array; each trend
+        # series is then a column of it
+        series = np.empty(len(self.snapshots), dtype=self._TREND_DTYPE)
+        for i, s in enumerate(self.snapshots):
+            series[i] = (len(s.tokens), len(s.stats.get('nodes', {})), s.stats['balance_score'],
+                         s.stats['gap_count'], s.stats['gap_percentage'])
+        
         trends = {
             'timestamps': [s.timestamp for s in self.snapshots],
-            'total_tokens': [len(s.tokens) for s in self.snapshots],
-            'node_counts': [len(s.stats.get('nodes', {})) for s in self.snapshots],
-            'balance_scores': [s.stats['balance_score'] for s in self.snapshots],
-            'gap_counts': [s.stats['gap_count'] for s in self.snapshots],
-            'gap_percentages': [s.stats['gap_percentage'] for s in self.snapshots]
+            'labels': [s.label for s in self.snapshots],
+            'total_tokens': series['tokens'].tolist(),
+            'node_counts': series['nodes'].tolist(),
+            'balance_scores': series['balance'].tolist(),
+            'gap_counts': series['gaps'].tolist(),
+            'gap_percentages': series['gap_pct'].tolist()
         }
         
         # Calculate trends
-        trends['token_trend'] = 'increasing' if trends['total_tokens'][-1] > trends['total_tokens'][0] else 'decreasing' if trends['total_tokens'][-1] < trends['total_tokens'][0] else 'stable'
-        trends['balance_trend'] = 'improving' if trends['balance_scores'][-1] > trends['balance_scores'][0] else 'degrading' if trends['balance_scores'][-1] < trends['balance_scores'][0] else 'stable'
-        trends['gap_trend'] = 'increasing' if trends['gap_counts'][-1] > trends['gap_counts'][0] else 'decreasing' if trends['gap_counts'][-1] < trends['gap_counts'][0] else 'stable'
+        token_dir = _trend_direction(series['tokens'])
+        balance_dir = _trend_direction(series['balance'])
+        gap_dir = _trend_direction(series['gaps'])
+        
+        trends['token_trend'] = _DIR[token_dir + 1]
+        trends['balance_trend'] = _BAL[balance_dir + 1]
+        trends['gap_trend'] = _DIR[gap_dir + 1]
         
         return trends
     
     def export_comparison(self, comparison: Dict, filepath: str):
         """Export comparison results to JSON file."""
-        # Convert datetime objects to strings for JSON serialization
-        export_data = comparison.copy()
-        export_data['timestamp1'] = comparison['timestamp1'].isoformat()
-        export_data['timestamp2'] = comparison['timestamp2'].isoformat()
-        export_data['time_delta'] = str(comparison['time_delta'])
-        
-        with open(filepath, 'w') as f:
-            json.dump(export_data, f, indent=2)
+        # Serialized as-is; the encoders call _json_default for the values
+        # JSON has no type for, so the comparison is never copied
+        if HAVE_ORJSON:
+            with open(filepath, 'wb') as f:
+                f.write(orjson.dumps(comparison, default=_json_default,
+                                     option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY))
+        else:
+            with open(filepath, 'w') as f:
+                json.dump(comparison, f, indent=2, default=_json_default)
         
         print(f"Comparison exported to: {filepath}")
 
@@ -174,25 +311,75 @@ class HistoricalAnalyzer:
 class HistoricalVisualizer:
     """Visualizes historical trends and comparisons."""
     
-    def create_trend_plot(self, trends: Dict, figsize: Tuple[int, int] = (14, 10)) -> plt.Figure:
+    def _subplot_grid(self, fig: Optional['plt.Figure'], figsize: Tuple[int, int]):
+        """Return a figure and its 2x2 axes, clearing and reusing fig if given."""
+        import matplotlib.pyplot as plt
+        
+        if fig is None:
+            return plt.subplots(2, 2, figsize=figsize, constrained_layout=True)
+        
+        fig.clear()
+        fig.set_size_inches(figsize)
+        return fig, fig.subplots(2, 2)
+    
+    def _add_series(self, ax, labels: List[str], values: List[float], color: str):
+        """
+        Draw a marked line over categorical labels as a single Line2D.
+        Limits are set directly from the data, so no autoscale pass runs.
+        """
+        from matplotlib.lines import Line2D
+        
+        n = len(values)
+        ax.add_line(Line2D(range(n), values, marker='o', linewidth=2, color=color,
+                           rasterized=True))
+        
+        # Same 5% margins autoscaling would add
+        x_pad = max(n - 1, 1) * 0.05
+        y_min, y_max = min(values), max(values)
+        y_pad = (y_max - y_min) * 0.05 or abs(y_max) * 0.05 or 1
+        ax.set_xlim(-x_pad, n - 1 + x_pad)
+        ax.set_ylim(y_min - y_pad, y_max + y_pad)
+        ax.set_xticks(range(n))
+        ax.set_xticklabels(labels)
+    
+    def _add_bars(self, ax, labels: List[str], heights: List[float], colors: List[str]):
+        """Draw categorical bars as Rectangle patches with explicitly set limits."""
+        from matplotlib.patches import Rectangle
+        
+        for i, (height, color) in enumerate(zip(heights, colors)):
+            ax.add_patch(Rectangle((i - 0.4, 0), 0.8, height, facecolor=color, alpha=0.7,
+                                   rasterized=True))
+        
+        # Bars start at zero; leave 5% headroom above the tallest
+        top = max(heights) * 1.05 or 1
+        ax.set_xlim(-0.6, len(heights) - 0.4)
+        ax.set_ylim(min(0, min(heights)), top)
+        ax.set_xticks(range(len(labels)))
+        ax.set_xticklabels(labels)
+    
+    def create_trend_plot(self, trends: Dict, figsize: Tuple[int, int] = (14, 10),
+                          fig: Optional['plt.Figure'] = None) -> 'plt.Figure':
         """
         Create a multi-panel trend visualization.
         
         Args:
             trends: Trends dictionary from HistoricalAnalyzer
             figsize: Figure size in inches
+            fig: Existing figure to clear and draw into (a new one if omitted)
             
         Returns:
             matplotlib Figure
         """
-        fig, axes = plt.subplots(2, 2, figsize=figsize)
+        fig, axes = self._subplot_grid(fig, figsize)
         
-        timestamps = trends['timestamps']
-        time_labels = [t.strftime('%Y-%m-%d %H:%M') for t in timestamps]
+        # Labels are formatted once per snapshot by HistoricalAnalyzer
+        time_labels = trends.get('labels')
+        if time_labels is None:
+            time_labels = [t.strftime('%Y-%m-%d %H:%M') for t in trends['timestamps']]
         
         # 1. Token count over time
         ax1 = axes[0, 0]
-        ax1.plot(time_labels, trends['total_tokens'], marker='o', linewidth=2, color='steelblue')
+        self._add_series(ax1, time_labels, trends['total_tokens'], 'steelblue')
         ax1.set_title('Total Tokens Over Time', fontweight='bold', fontsize=12)
         ax1.set_ylabel('Token Count')
         ax1.grid(True, alpha=0.3)
@@ -200,7 +387,7 @@ class HistoricalVisualizer:
         
         # 2. Balance score over time
         ax2 = axes[0, 1]
-        ax2.plot(time_labels, trends['balance_scores'], marker='o', linewidth=2, color='mediumseagreen')
+        self._add_series(ax2, time_labels, trends['balance_scores'], 'mediumseagreen')
         ax2.axhline(y=0.9, color='green', linestyle='--', alpha=0.5, label='Good (>0.9)')
         ax2.axhline(y=0.7, color='orange', linestyle='--', alpha=0.5, label='Fair (>0.7)')
         ax2.set_title('Balance Score Over Time', fontweight='bold', fontsize=12)
@@ -212,7 +399,7 @@ class HistoricalVisualizer:
         
         # 3. Node count over time
         ax3 = axes[1, 0]
-        ax3.plot(time_labels, trends['node_counts'], marker='o', linewidth=2, color='coral')
+        self._add_series(ax3, time_labels, trends['node_counts'], 'coral')
         ax3.set_title('Node Count Over Time', fontweight='bold', fontsize=12)
         ax3.set_ylabel('Number of Nodes')
         ax3.grid(True, alpha=0.3)
@@ -220,29 +407,30 @@ class HistoricalVisualizer:
         
         # 4. Gap percentage over time
         ax4 = axes[1, 1]
-        ax4.plot(time_labels, trends['gap_percentages'], marker='o', linewidth=2, color='crimson')
+        self._add_series(ax4, time_labels, trends['gap_percentages'], 'crimson')
         ax4.set_title('Gap Percentage Over Time', fontweight='bold', fontsize=12)
         ax4.set_ylabel('Gap Percentage (%)')
         ax4.grid(True, alpha=0.3)
         ax4.tick_params(axis='x', rotation=45)
         
         fig.suptitle('Ring Topology Trends', fontsize=16, fontweight='bold')
-        plt.tight_layout()
         
         return fig
     
-    def create_comparison_plot(self, comparison: Dict, figsize: Tuple[int, int] = (12, 8)) -> plt.Figure:
+    def create_comparison_plot(self, comparison: Dict, figsize: Tuple[int, int] = (12, 8),
+                               fig: Optional['plt.Figure'] = None) -> 'plt.Figure':
         """
         Create a visualization comparing two snapshots.
         
         Args:
             comparison: Comparison dictionary from HistoricalAnalyzer
             figsize: Figure size in inches
+            fig: Existing figure to clear and draw into (a new one if omitted)
             
         Returns:
             matplotlib Figure
         """
-        fig, axes = plt.subplots(2, 2, figsize=figsize)
+        fig, axes = self._subplot_grid(fig, figsize)
         
         # 1. Node changes
         ax1 = axes[0, 0]
@@ -253,16 +441,16 @@ class HistoricalVisualizer:
             len(comparison['nodes_unchanged'])
         ]
         colors = ['green', 'red', 'gray']
-        ax1.bar(categories, counts, color=colors, alpha=0.7)
+        self._add_bars(ax1, categories, counts, colors)
         ax1.set_title('Node Changes', fontweight='bold')
         ax1.set_ylabel('Count')
         ax1.grid(axis='y', alpha=0.3)
         
         # 2. Token count change
         ax2 = axes[0, 1]
-        ax2.bar(['Before', 'After'], 
-               [comparison['total_tokens_before'], comparison['total_tokens_after']],
-               color=['steelblue', 'darkblue'], alpha=0.7)
+        self._add_bars(ax2, ['Before', 'After'],
+                       [comparison['total_tokens_before'], comparison['total_tokens_after']],
+                       ['steelblue', 'darkblue'])
         ax2.set_title('Total Token Count', fontweight='bold')
         ax2.set_ylabel('Tokens')
         ax2.grid(axis='y', alpha=0.3)
@@ -273,10 +461,9 @@ class HistoricalVisualizer:
         balance_after = comparison['balance_score_after']
         balance_change = comparison['balance_change']
         
-        bars = ax3.bar(['Before', 'After'], [balance_before, balance_after],
-                      color=['orange' if balance_before < 0.9 else 'green',
-                            'orange' if balance_after < 0.9 else 'green'],
-                      alpha=0.7)
+        self._add_bars(ax3, ['Before', 'After'], [balance_before, balance_after],
+                       ['orange' if balance_before < 0.9 else 'green',
+                        'orange' if balance_after < 0.9 else 'green'])
         ax3.axhline(y=0.9, color='green', linestyle='--', alpha=0.5)
         ax3.set_title(f'Balance Score (Δ: {balance_change:+.3f})', fontweight='bold')
         ax3.set_ylabel('Score')
@@ -285,9 +472,9 @@ class HistoricalVisualizer:
         
         # 4. Gap changes
         ax4 = axes[1, 1]
-        ax4.bar(['Before', 'After'],
-               [comparison['gaps_before'], comparison['gaps_after']],
-               color=['coral', 'crimson'], alpha=0.7)
+        self._add_bars(ax4, ['Before', 'After'],
+                       [comparison['gaps_before'], comparison['gaps_after']],
+                       ['coral', 'crimson'])
         ax4.set_title(f'Gap Count (Δ: {comparison["gap_change"]:+d})', fontweight='bold')
         ax4.set_ylabel('Gaps')
         ax4.grid(axis='y', alpha=0.3)
@@ -298,68 +485,77 @@ class HistoricalVisualizer:
                     f'{comparison["timestamp2"].strftime("%Y-%m-%d %H:%M")} (Δ: {time_delta})',
                     fontsize=14, fontweight='bold')
         
-        plt.tight_layout()
         return fig
 
 
 def print_comparison_report(comparison: Dict):
     """Print a detailed comparison report."""
-    print("\n" + "="*70)
-    print("RING COMPARISON REPORT")
-    print("="*70)
-    print(f"Time Period: {comparison['timestamp1'].strftime('%Y-%m-%d %H:%M')} → "
-          f"{comparison['timestamp2'].strftime('%Y-%m-%d %H:%M')}")
-    print(f"Duration: {comparison['time_delta']}")
-    print()
-    
-    print("NODE CHANGES:")
-    print(f"  Added: {len(comparison['nodes_added'])} nodes")
+    # Collect the report and write it to stdout in one call
+    lines = []
+    lines.append("\n" + "="*70)
+    lines.append("RING COMPARISON REPORT")
+    lines.append("="*70)
+    lines.append(f"Time Period: {comparison['timestamp1'].strftime('%Y-%m-%d %H:%M')} → "
+                 f"{comparison['timestamp2'].strftime('%Y-%m-%d %H:%M')}")
+    lines.append(f"Duration: {comparison['time_delta']}")
+    lines.append("")
+    
+    lines.append("NODE CHANGES:")
+    lines.append(f"  Added: {len(comparison['nodes_added'])} nodes")
     if comparison['nodes_added']:
         for node in comparison['nodes_added']:
-            print(f"    + {node}")
+            lines.append(f"    + {node}")
     
-    print(f"  Removed: {len(comparison['nodes_removed'])} nodes")
+    lines.append(f"  Removed: {len(comparison['nodes_removed'])} nodes")
     if comparison['nodes_removed']:
         for node in comparison['nodes_removed']:
-            print(f"    - {node}")
+            lines.append(f"    - {node}")
     
-    print(f"  Unchanged: {len(comparison['nodes_unchanged'])} nodes")
-    print()
+    lines.append(f"  Unchanged: {len(comparison['nodes_unchanged'])} nodes")
+    lines.append("")
     
-    print("TOKEN CHANGES:")
-    print(f"  Before: {comparison['total_tokens_before']} tokens")
-    print(f"  After: {comparison['total_tokens_after']} tokens")
-    print(f"  Change: {comparison['total_tokens_after'] - comparison['total_tokens_before']:+d}")
+    lines.append("TOKEN CHANGES:")
+    lines.append(f"  Before: {comparison['total_tokens_before']} tokens")
+    lines.append(f"  After: {comparison['total_tokens_after']} tokens")
+    lines.append(f"  Change: {comparison['total_tokens_after'] - comparison['total_tokens_before']:+d}")
     
     if comparison['token_changes']:
-        print("\n  Per-Node Token Changes:")
+        lines.append("\n  Per-Node Token Changes:")
         for node, changes in comparison['token_changes'].items():
-            print(f"    {node}: {changes['before']} → {changes['after']} ({changes['change']:+d})")
-    print()
+            lines.append(f"    {node}: {changes['before']} → {changes['after']} ({changes['change']:+d})")
+    lines.append("")
     
-    print("BALANCE METRICS:")
-    print(f"  Balance Score Before: {comparison['balance_score_before']:.3f}")
-    print(f"  Balance Score After: {comparison['balance_score_after']:.3f}")
-    print(f"  Change: {comparison['balance_change']:+.3f}")
+    lines.append("BALANCE METRICS:")
+    lines.append(f"  Balance Score Before: {comparison['balance_score_before']:.3f}")
+    lines.append(f"  Balance Score After: {comparison['balance_score_after']:.3f}")
+    lines.append(f"  Change: {comparison['balance_change']:+.3f}")
     
     if comparison['balance_change'] > 0:
-        print("  ✓ Balance IMPROVED")
+        lines.append("  ✓ Balance IMPROVED")
     elif comparison['balance_change'] < 0:
-        print("  ✗ Balance DEGRADED")
+        lines.append("  ✗ Balance DEGRADED")
     else:
-        print("  = Balance UNCHANGED")
-    print()
-    
-    print("GAP ANALYSIS:")
-    print(f"  Gaps Before: {comparison['gaps_before']}")
-    print(f"  Gaps After: {comparison['gaps_after']}")
-    print(f"  Change: {comparison['gap_change']:+d}")
-    print(f"  Gap % Change: {comparison['gap_pct_change']:+.2f}%")
-    print("="*70 + "\n")
+        lines.append("  = Balance UNCHANGED")
+    lines.append("")
+    
+    lines.append("GAP ANALYSIS:")
+    lines.append(f"  Gaps Before: {comparison['gaps_before']}")
+    lines.append(f"  Gaps After: {comparison['gaps_after']}")
+    lines.append(f"  Change: {comparison['gap_change']:+d}")
+    lines.append(f"  Gap % Change: {comparison['gap_pct_change']:+.2f}%")
+    lines.append("="*70 + "\n")
+    
+    sys.stdout.write('\n'.join(lines) + '\n')
 
 
 if __name__ == '__main__':
     import argparse
+    import os
+    import matplotlib
+    
+    # The CLI only writes files, so skip any interactive backend
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
     
     parser = argparse.ArgumentParser(
         description='Analyze historical changes in Cassandra ring topology'
@@ -382,18 +578,23 @@ if __name__ == '__main__':
     # Create analyzer and add snapshots
     analyzer = HistoricalAnalyzer()
     
-    for i, filepath in enumerate(args.ring_files):
-        # Use file modification time or sequential timestamps
-        timestamp = datetime.now().replace(hour=i, minute=0, second=0, microsecond=0)
-        analyzer.add_snapshot(filepath, timestamp)
+    # Use file modification time or sequential timestamps
+    timestamps = [datetime.now().replace(hour=i, minute=0, second=0, microsecond=0)
+                  for i in range(len(args.ring_files))]
+    try:
+        analyzer.add_snapshots(args.ring_files, timestamps)
+    except (OSError, ValueError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
     
-    # Generate visualization
+    # Generate visualization into a single figure shared by the renderers
     visualizer = HistoricalVisualizer()
+    fig = plt.figure(constrained_layout=True)
     
     if args.trends:
         # Trend analysis
         trends = analyzer.detect_trends()
-        fig = visualizer.create_trend_plot(trends)
+        fig = visualizer.create_trend_plot(trends, fig=fig)
         print(f"\nTrend Analysis:")
         print(f"  Token Trend: {trends['token_trend']}")
         print(f"  Balance Trend: {trends['balance_trend']}")
@@ -402,14 +603,19 @@ if __name__ == '__main__':
         # Compare first and last snapshots
         comparison = analyzer.compare_snapshots(0, len(analyzer.snapshots) - 1)
         print_comparison_report(comparison)
-        fig = visualizer.create_comparison_plot(comparison)
+        fig = visualizer.create_comparison_plot(comparison, fig=fig)
         
         # Export if requested
         if args.export_json:
             analyzer.export_comparison(comparison, args.export_json)
     
-    # Save figure
-    fig.savefig(args.output, dpi=args.dpi, bbox_inches='tight', facecolor='white')
+    # Save figure; constrained layout already fits the titles, so no tight
+    # bbox pass is needed, and PNGs use the fast zlib level like the core CLI
+    save_kwargs = {}
+    if os.path.splitext(args.output)[1].lower() in ('', '.png'):
+        save_kwargs['pil_kwargs'] = {'compress_level': 1}
+    
+    fig.savefig(args.output, dpi=args.dpi, facecolor='white', **save_kwargs)
     print(f"Visualization saved to: {args.output}")
 
 # Made with Bob
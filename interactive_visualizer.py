@@ -4,12 +4,86 @@ Interactive Ring Visualizer using Plotly
 Creates interactive HTML visualizations with hover tooltips and zoom capabilities.
 """
 
+import gzip
+import hashlib
+import json
+import os
+import re
+import shutil
 from typing import List, Dict, Tuple, Optional
+import plotly
 import plotly.graph_objects as go
 import plotly.express as px
+import plotly.io as pio
+from plotly.offline import get_plotlyjs_version
 from plotly.subplots import make_subplots
 import numpy as np
+import cassandra_ring_analyzer
+import numba_utils
 from cassandra_ring_analyzer import TokenEntry, TokenRange, TokenAnalyzer
+from numba_utils import build_wedges
+
+# Plotly.js config for saved pages: no logo link, resize with the window
+_HTML_CONFIG = {'displaylogo': False, 'responsive': True}
+
+# Page used by save_html(split_data=True); the figure is loaded from a
+# separate script rather than fetch(), which browsers block on file:// URLs
+_SPLIT_HTML_TEMPLATE = """<!DOCTYPE html>
+<html>
+<head>
+<meta charset="utf-8">
+<script src="https://cdn.plot.ly/plotly-{version}.min.js"></script>
+</head>
+<body>
+<div id="ring"></div>
+<script src="{data_file}"></script>
+<script>Plotly.newPlot('ring', RING_FIGURE.data, RING_FIGURE.layout, {config});</script>
+</body>
+</html>
+"""
+
+# Load strings as printed by nodetool (e.g. "1.26 TiB"), converted to GB
+_LOAD_RE = re.compile(r"(\d+(?:\.\d+)?)\s*(TiB|TB|GiB|GB|MiB|MB|KiB|KB|bytes)\b", re.I)
+_UNIT_TO_GB = {
+    'tib': 1024, 'tb': 1024,
+    'gib': 1, 'gb': 1,
+    'mib': 1 / 1024, 'mb': 1 / 1024,
+    'kib': 1 / 1048576, 'kb': 1 / 1048576,
+    'bytes': 1 / 1073741824,
+}
+
+
+def _load_to_gb(load: str) -> float:
+    """Convert a load string to GB, or 0.0 if it cannot be parsed."""
+    match = _LOAD_RE.search(load or '')
+    if match is None:
+        return 0.0
+    return float(match.group(1)) * _UNIT_TO_GB[match.group(2).lower()]
+
+
+try:
+    from plotly_resampler import FigureResampler
+    HAVE_RESAMPLER = True
+except ImportError:
+    HAVE_RESAMPLER = False
+
+# Hover text templates for ring wedges
+_HOVER_TPL_NODE = (
+    "<b>Node: {owner}</b><br>"
+    "Start Token: {s:,}<br>"
+    "End Token: {e:,}<br>"
+    "Range Size: {sz:,}<br>"
+    "Percentage: {pct:.3f}%<br>"
+    "Load: {load}<br>"
+    "Total Tokens: {tc}"
+)
+_HOVER_TPL_GAP = (
+    "<b>GAP DETECTED</b><br>"
+    "Start Token: {s:,}<br>"
+    "End Token: {e:,}<br>"
+    "Size: {sz:,}<br>"
+    "Percentage: {pct:.3f}%"
+)
 
 
 class InteractiveRingVisualizer:
@@ -19,9 +93,21 @@ class InteractiveRingVisualizer:
     MIN_TOKEN = -(2**63)
     MAX_TOKEN = 2**63 - 1
     
-    def __init__(self):
+    # Center circle outline, shared by every ring figure
+    _theta_circle = np.linspace(0, 2*np.pi, 100)
+    _X_CIRCLE = 0.5 * np.cos(_theta_circle)
+    _Y_CIRCLE = 0.5 * np.sin(_theta_circle)
+    
+    # Inner and outer ring edges as one NaN-separated path
+    _theta_edge = np.linspace(0, 2*np.pi, 361)
+    _X_RING_EDGES = np.concatenate([0.6 * np.cos(_theta_edge), [np.nan], np.cos(_theta_edge), [np.nan]])
+    _Y_RING_EDGES = np.concatenate([0.6 * np.sin(_theta_edge), [np.nan], np.sin(_theta_edge), [np.nan]])
+    
+    def __init__(self, fast_hover: bool = False):
         self.color_map = {}
         self.color_palette = px.colors.qualitative.Set3
+        # Hover on one marker per wedge instead of on every outline point
+        self.fast_hover = fast_hover
     
     def assign_colors(self, nodes: List[str]) -> Dict[str, str]:
         """Assign distinct colors to each node."""
@@ -39,6 +125,15 @@ class InteractiveRingVisualizer:
         normalized = (token_value - self.MIN_TOKEN) / (self.MAX_TOKEN - self.MIN_TOKEN)
         return normalized * 360
     
+    def tokens_to_angles(self, tokens: np.ndarray) -> np.ndarray:
+        """Convert an array of token values to angles in degrees (0-360)."""
+        return ((tokens.astype(np.float64) - self.MIN_TOKEN) / (self.MAX_TOKEN - self.MIN_TOKEN)) * 360.0
+    
+    @staticmethod
+    def _spokes(unit: np.ndarray) -> np.ndarray:
+        """Radial segments from the inner to the outer ring edge, NaN-separated."""
+        return np.column_stack([0.6 * unit, unit, np.full(len(unit), np.nan)]).ravel()
+    
     def create_interactive_ring(self, ranges: List[TokenRange], stats: Dict,
                                title: str = "Cassandra Token Ring") -> go.Figure:
         """
@@ -54,79 +149,114 @@ class InteractiveRingVisualizer:
         """
         fig = go.Figure()
         
-        # Assign colors
-        nodes = [r.owner for r in ranges if not r.is_gap]
-        self.assign_colors(nodes)
+        # Wedge angles for all ranges at once
+        start_angles = self.tokens_to_angles(
+            np.fromiter((r.start_token for r in ranges), dtype=np.int64, count=len(ranges)))
+        end_angles = self.tokens_to_angles(
+            np.fromiter((r.end_token for r in ranges), dtype=np.int64, count=len(ranges)))
+        spans = np.where(end_angles < start_angles, end_angles + 360, end_angles) - start_angles
         
-        # Create wedges for each range
-        for range_obj in ranges:
-            start_angle = self.token_to_angle(range_obj.start_token)
-            end_angle = self.token_to_angle(range_obj.end_token)
-            
-            if end_angle < start_angle:
-                end_angle += 360
-            
-            # Create arc points
-            theta = np.linspace(np.deg2rad(start_angle), np.deg2rad(end_angle), 50)
-            r_inner = 0.6
-            r_outer = 1.0
-            
-            # Convert to cartesian coordinates
-            x_inner = r_inner * np.cos(theta)
-            y_inner = r_inner * np.sin(theta)
-            x_outer = r_outer * np.cos(theta)
-            y_outer = r_outer * np.sin(theta)
-            
-            # Create closed path for the wedge
-            x = np.concatenate([x_inner, x_outer[::-1], [x_inner[0]]])
-            y = np.concatenate([y_inner, y_outer[::-1], [y_inner[0]]])
-            
-            # Determine color and hover text
+        # Hover text per range, grouped by legend entry (each node, plus one
+        # shared gap entry) in order of first appearance
+        groups = {}
+        hover_texts = []
+        format_node = _HOVER_TPL_NODE.format
+        format_gap = _HOVER_TPL_GAP.format
+        nodes_stats = stats['nodes']
+        pct_factor = 100 / self.TOKEN_SPACE
+        for i, range_obj in enumerate(ranges):
+            # Determine hover text
             if range_obj.is_gap:
-                color = self.color_map['GAP']
-                hover_text = (
-                    f"<b>GAP DETECTED</b><br>"
-                    f"Start Token: {range_obj.start_token:,}<br>"
-                    f"End Token: {range_obj.end_token:,}<br>"
-                    f"Size: {range_obj.size:,}<br>"
-                    f"Percentage: {(range_obj.size/self.TOKEN_SPACE)*100:.3f}%"
+                hover_text = format_gap(
+                    s=range_obj.start_token, e=range_obj.end_token,
+                    sz=range_obj.size, pct=range_obj.size * pct_factor
                 )
-                name = "Gap"
-                showlegend = True
+                key = 'GAP'
             else:
-                color = self.color_map[range_obj.owner]
-                node_stats = stats['nodes'].get(range_obj.owner, {})
-                hover_text = (
-                    f"<b>Node: {range_obj.owner}</b><br>"
-                    f"Start Token: {range_obj.start_token:,}<br>"
-                    f"End Token: {range_obj.end_token:,}<br>"
-                    f"Range Size: {range_obj.size:,}<br>"
-                    f"Percentage: {(range_obj.size/self.TOKEN_SPACE)*100:.3f}%<br>"
-                    f"Load: {node_stats.get('load', 'N/A')}<br>"
-                    f"Total Tokens: {node_stats.get('token_count', 0)}"
+                node_stats = nodes_stats.get(range_obj.owner, {})
+                hover_text = format_node(
+                    owner=range_obj.owner,
+                    s=range_obj.start_token, e=range_obj.end_token,
+                    sz=range_obj.size, pct=range_obj.size * pct_factor,
+                    load=node_stats.get('load', 'N/A'),
+                    tc=node_stats.get('token_count', 0)
                 )
-                name = range_obj.owner
-                showlegend = range_obj.owner not in [trace.name for trace in fig.data]
+                key = range_obj.owner
+            
+            hover_texts.append(hover_text)
+            groups.setdefault(key, []).append(i)
+        
+        hover_texts = np.array(hover_texts, dtype=object)
+        
+        # Assign colors from the distinct owners rather than every range
+        color_map = self.assign_colors([key for key in groups if key != 'GAP'])
+        
+        # Arc resolution scales with wedge size: about one point per degree,
+        # between 3 and 50 points per arc
+        n_points = np.clip(spans.astype(np.int64) + 2, 3, 50)
+        
+        # Build every wedge path in group order, then cut per group
+        order = np.concatenate([np.asarray(indices) for indices in groups.values()])
+        x_all, y_all = build_wedges(start_angles[order], spans[order], n_points[order], 0.6, 1.0)
+        group_sizes = [len(indices) for indices in groups.values()]
+        bounds = np.cumsum(2 * n_points[order] + 2)[np.cumsum(group_sizes)[:-1] - 1]
+        if self.fast_hover:
+            hover_parts = [None] * len(groups)
+        else:
+            hover_parts = np.split(np.repeat(hover_texts[order], 2 * n_points[order] + 2), bounds)
+        
+        # One WebGL trace per group; a NaN point after each wedge splits the
+        # trace into separate filled polygons
+        gap_trace = None
+        for key, x, y, hover in zip(groups, np.split(x_all, bounds),
+                                    np.split(y_all, bounds), hover_parts):
+            is_gap = key == 'GAP'
             
-            fig.add_trace(go.Scatter(
+            trace = go.Scattergl(
                 x=x, y=y,
                 fill='toself',
-                fillcolor=color,
-                line=dict(color='black' if not range_obj.is_gap else 'red', width=1),
-                hovertext=hover_text,
-                hoverinfo='text',
-                name=name,
-                showlegend=showlegend,
+                fillcolor=color_map[key],
+                line=dict(color='red', width=1) if is_gap else dict(width=0),
+                hovertext=hover,
+                hoverinfo='skip' if self.fast_hover else 'text',
+                name="Gap" if is_gap else key,
                 mode='lines'
+            )
+            if is_gap:
+                gap_trace = trace
+            else:
+                fig.add_trace(trace)
+        
+        # Wedge borders as one trace: both ring edges plus a radial spoke at
+        # every range boundary
+        fig.add_trace(go.Scattergl(
+            x=np.concatenate([self._X_RING_EDGES, self._spokes(np.cos(np.deg2rad(start_angles)))]),
+            y=np.concatenate([self._Y_RING_EDGES, self._spokes(np.sin(np.deg2rad(start_angles)))]),
+            line=dict(color='black', width=1),
+            hoverinfo='skip',
+            showlegend=False,
+            mode='lines'
+        ))
+        
+        # Gaps go on top so their red borders are not hidden by the outline
+        if gap_trace is not None:
+            fig.add_trace(gap_trace)
+        
+        # Invisible hover markers at the middle of each wedge
+        if self.fast_hover:
+            mid = np.deg2rad(start_angles + spans / 2)
+            fig.add_trace(go.Scattergl(
+                x=0.8 * np.cos(mid), y=0.8 * np.sin(mid),
+                mode='markers',
+                marker=dict(size=8, opacity=0.0),
+                hovertext=hover_texts,
+                hoverinfo='text',
+                showlegend=False
             ))
         
         # Add center circle
-        theta_circle = np.linspace(0, 2*np.pi, 100)
-        x_circle = 0.5 * np.cos(theta_circle)
-        y_circle = 0.5 * np.sin(theta_circle)
-        
         fig.add_trace(go.Scatter(
-            x=x_circle, y=y_circle,
+            x=self._X_CIRCLE, y=self._Y_CIRCLE,
             fill='toself',
             fillcolor='white',
             line=dict(color='gray', width=2),
@@ -164,16 +294,19 @@ class InteractiveRingVisualizer:
                 showgrid=False,
                 showticklabels=False,
                 zeroline=False,
+                autorange=False,
                 range=[-1.2, 1.2]
             ),
             yaxis=dict(
                 showgrid=False,
                 showticklabels=False,
                 zeroline=False,
+                autorange=False,
                 range=[-1.2, 1.2],
                 scaleanchor='x',
                 scaleratio=1
             ),
+            uirevision='ring',
             plot_bgcolor='white',
             hovermode='closest',
             width=900,
@@ -203,10 +336,15 @@ class InteractiveRingVisualizer:
             Plotly Figure with subplots
         """
         # Prepare data
-        nodes = list(stats.get('nodes', {}).keys())
-        token_counts = [stats['nodes'][n]['token_count'] for n in nodes]
-        coverage_pcts = [stats['nodes'][n]['coverage_percentage'] for n in nodes]
-        loads = [stats['nodes'][n]['load'] for n in nodes]
+        nodes, token_counts, coverage_pcts, loads = [], [], [], []
+        for node, node_stats in stats.get('nodes', {}).items():
+            nodes.append(node)
+            token_counts.append(node_stats['token_count'])
+            coverage_pcts.append(node_stats['coverage_percentage'])
+            loads.append(node_stats['load'])
+        node_labels = np.asarray(nodes, dtype=object)
+        token_counts = np.asarray(token_counts, dtype=np.float64)
+        coverage_pcts = np.asarray(coverage_pcts, dtype=np.float64)
         
         # Create subplots
         fig = make_subplots(
@@ -226,7 +364,7 @@ class InteractiveRingVisualizer:
         # 1. Token distribution
         fig.add_trace(
             go.Bar(
-                x=nodes,
+                x=node_labels,
                 y=token_counts,
                 name='Token Count',
                 marker_color='steelblue',
@@ -238,7 +376,7 @@ class InteractiveRingVisualizer:
         # 2. Coverage percentage
         fig.add_trace(
             go.Bar(
-                x=nodes,
+                x=node_labels,
                 y=coverage_pcts,
                 name='Coverage %',
                 marker_color='mediumseagreen',
@@ -274,28 +412,12 @@ class InteractiveRingVisualizer:
         )
         
         # 4. Node loads (parse load values)
-        load_values = []
-        for load in loads:
-            try:
-                # Extract numeric value from load string (e.g., "1.26 TiB")
-                parts = load.split()
-                if len(parts) >= 2:
-                    value = float(parts[0])
-                    unit = parts[1].upper()
-                    # Convert to GB for comparison
-                    if 'TIB' in unit or 'TB' in unit:
-                        value *= 1024
-                    elif 'MIB' in unit or 'MB' in unit:
-                        value /= 1024
-                    load_values.append(value)
-                else:
-                    load_values.append(0)
-            except:
-                load_values.append(0)
+        load_values = np.fromiter((_load_to_gb(load) for load in loads),
+                                  dtype=np.float64, count=len(loads))
         
         fig.add_trace(
             go.Bar(
-                x=nodes,
+                x=node_labels,
                 y=load_values,
                 name='Load (GB)',
                 marker_color='coral',
@@ -324,14 +446,86 @@ class InteractiveRingVisualizer:
         
         return fig
     
-    def save_html(self, fig: go.Figure, filepath: str):
-        """Save figure as interactive HTML file."""
-        fig.write_html(filepath, include_plotlyjs='cdn')
-        print(f"Interactive visualization saved to: {filepath}")
+    def save_html(self, fig: go.Figure, filepath: str, split_data: bool = False,
+                  compress: bool = False):
+        """
+        Save figure as interactive HTML file.
+        
+        With split_data, the figure JSON goes to a sibling .data.js file that
+        the page loads after its skeleton, keeping the HTML itself small.
+        With compress, or a filepath ending in .gz, each written file also
+        gets a gzipped .gz copy.
+        """
+        if filepath.endswith('.gz'):
+            filepath = filepath[:-3]
+            compress = True
+        
+        if not split_data:
+            # Traces were built through validated constructors already
+            fig.write_html(filepath, include_plotlyjs='cdn', validate=False,
+                           full_html=True, config=_HTML_CONFIG)
+            written = [filepath]
+            print(f"Interactive visualization saved to: {filepath}")
+        else:
+            data_path = os.path.splitext(filepath)[0] + '.data.js'
+            with open(data_path, 'w', encoding='utf-8') as f:
+                f.write('var RING_FIGURE = ')
+                f.write(pio.to_json(fig, validate=False))
+                f.write(';\n')
+            
+            with open(filepath, 'w', encoding='utf-8') as f:
+                f.write(_SPLIT_HTML_TEMPLATE.format(
+                    version=get_plotlyjs_version(),
+                    data_file=os.path.basename(data_path),
+                    config=json.dumps(_HTML_CONFIG)
+                ))
+            written = [filepath, data_path]
+            print(f"Interactive visualization saved to: {filepath} (data: {data_path})")
+        
+        if compress:
+            for path in written:
+                print(f"Compressed copy saved to: {gzip_copy(path)}")
+    
+    def serve_resampled(self, fig: go.Figure):
+        """
+        Serve figure from a local Dash app that downsamples its traces.
+        
+        plotly-resampler re-samples the visible range on every zoom, which
+        needs a running server, so there is no static HTML equivalent.
+        """
+        FigureResampler(fig, default_n_shown_samples=2000).show_dash(mode='external')
+
+
+def gzip_copy(filepath: str) -> str:
+    """Write a gzipped copy of a file next to it and return its path."""
+    gz_path = filepath + '.gz'
+    with open(filepath, 'rb') as src, gzip.open(gz_path, 'wb', compresslevel=6) as gz:
+        shutil.copyfileobj(src, gz)
+    return gz_path
+
+
+# Rendered pages from earlier runs, keyed by input contents and options
+CACHE_DIR = os.path.join(os.path.expanduser('~'), '.cache', 'ring-viz')
+
+
+def _cache_path(ring_file: str, *options) -> str:
+    """Return the cache file for a ring file rendered with the given options."""
+    digest = hashlib.sha1()
+    # Include this module and the analysis modules that compute every
+    # number on the page, so code changes invalidate old renders
+    for path in (ring_file, __file__, cassandra_ring_analyzer.__file__, numba_utils.__file__):
+        with open(path, 'rb') as f:
+            # Streamed in chunks so large ring dumps aren't buffered whole
+            for chunk in iter(lambda: f.read(1 << 20), b''):
+                digest.update(chunk)
+    # The plotly version and optional packages change the written page too
+    digest.update(repr((plotly.__version__, HAVE_RESAMPLER, options)).encode())
+    return os.path.join(CACHE_DIR, digest.hexdigest() + '.html')
 
 
 if __name__ == '__main__':
     import argparse
+    import sys
     from cassandra_ring_analyzer import RingParser
     
     parser = argparse.ArgumentParser(
@@ -344,12 +538,58 @@ if __name__ == '__main__':
                        help='Generate statistics dashboard instead of ring')
     parser.add_argument('--show', action='store_true',
                        help='Open in browser automatically')
+    parser.add_argument('--split-data', action='store_true',
+                       help='Write figure data to a separate .data.js file next to the HTML')
+    parser.add_argument('--resampler', action='store_true',
+                       help='Serve the dashboard from a local Dash app that downsamples '
+                            'traces with plotly-resampler (writes no HTML file)')
+    parser.add_argument('--fast-hover', action='store_true',
+                       help='Show ring hover details from one marker per wedge (faster for large rings)')
+    parser.add_argument('--gzip', action='store_true',
+                       help='Also write a gzipped .gz copy of each output file')
+    parser.add_argument('--no-cache', action='store_true',
+                       help=f'Rebuild the page even if a cached copy exists in {CACHE_DIR}')
     
     args = parser.parse_args()
+    if args.resampler and not args.dashboard:
+        parser.error('--resampler requires --dashboard')
+    if args.resampler and not HAVE_RESAMPLER:
+        parser.error('--resampler requires the plotly-resampler package')
+    
+    if args.dashboard:
+        output_file = args.output.replace('.html', '_dashboard.html')
+    else:
+        output_file = args.output
+    if output_file.endswith('.gz'):
+        output_file = output_file[:-3]
+        args.gzip = True
+    
+    # Reuse the page from an earlier run on the same input; --show,
+    # --split-data and --resampler need the figure itself, so they always rebuild
+    cache_file = None
+    if not (args.no_cache or args.show or args.split_data or args.resampler):
+        try:
+            cache_file = _cache_path(args.ring_file, args.dashboard, args.fast_hover)
+        except FileNotFoundError:
+            print(f"Error: Ring file '{args.ring_file}' not found", file=sys.stderr)
+            sys.exit(1)
+        except OSError as e:
+            print(f"Error: Error reading file: {e}", file=sys.stderr)
+            sys.exit(1)
+        if os.path.exists(cache_file):
+            shutil.copyfile(cache_file, output_file)
+            print(f"Interactive visualization saved to: {output_file} (cached)")
+            if args.gzip:
+                print(f"Compressed copy saved to: {gzip_copy(output_file)}")
+            sys.exit(0)
     
     # Parse ring file
     ring_parser = RingParser(args.ring_file)
-    tokens = ring_parser.parse_file()
+    try:
+        tokens = ring_parser.parse_file()
+    except (OSError, ValueError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
     
     # Analyze
     analyzer = TokenAnalyzer(tokens)
@@ -359,17 +599,27 @@ if __name__ == '__main__':
     stats['datacenter'] = ring_parser.datacenter
     
     # Create visualization
-    visualizer = InteractiveRingVisualizer()
+    visualizer = InteractiveRingVisualizer(fast_hover=args.fast_hover)
     
     if args.dashboard:
         fig = visualizer.create_statistics_dashboard(stats)
-        output_file = args.output.replace('.html', '_dashboard.html')
     else:
         fig = visualizer.create_interactive_ring(ranges, stats)
-        output_file = args.output
+    
+    if args.resampler:
+        visualizer.serve_resampled(fig)
+        sys.exit(0)
     
     # Save
-    visualizer.save_html(fig, output_file)
+    visualizer.save_html(fig, output_file, split_data=args.split_data,
+                         compress=args.gzip)
+    
+    if cache_file is not None:
+        try:
+            os.makedirs(CACHE_DIR, exist_ok=True)
+            shutil.copyfile(output_file, cache_file)
+        except OSError:
+            pass  # Caching is best effort
     
     # Show in browser if requested
     if args.show:
@@ -4,13 +4,17 @@ Multi-Datacenter Ring Analyzer
 Extends the basic ring analyzer to support multiple datacenters.
 """
 
-from typing import List, Dict, Tuple, Optional
+import os
+from typing import List, Dict, Tuple, Optional, TYPE_CHECKING
 from dataclasses import dataclass, field
-import matplotlib.pyplot as plt
-import matplotlib.patches as mpatches
+from concurrent.futures import ProcessPoolExecutor
 import numpy as np
 from cassandra_ring_analyzer import TokenEntry, TokenRange, RingParser, TokenAnalyzer
 
+if TYPE_CHECKING:
+    # matplotlib is imported lazily so parsing and statistics runs skip it
+    import matplotlib.pyplot as plt
+
 
 @dataclass
 class DatacenterInfo:
@@ -24,6 +28,9 @@ class DatacenterInfo:
 class MultiDCRingParser:
     """Parses ring files that may contain multiple datacenters."""
     
+    # Line-parser states
+    _SEEKING_DC, _SEEKING_HEADER, _PARSING_TOKENS = range(3)
+    
     def __init__(self, filepath: str):
         self.filepath = filepath
         self.datacenters: Dict[str, DatacenterInfo] = {}
@@ -35,84 +42,69 @@ class MultiDCRingParser:
         Returns:
             Dict mapping datacenter names to DatacenterInfo objects
         """
-        try:
-            with open(self.filepath, 'r') as f:
-                lines = f.readlines()
-        except FileNotFoundError:
-            raise FileNotFoundError(f"Ring file '{self.filepath}' not found")
-        except Exception as e:
-            raise Exception(f"Error reading file: {e}")
-        
         current_dc = None
-        i = 0
+        state = self._SEEKING_DC
         
-        while i < len(lines):
-            line = lines[i].strip()
-            
-            # Detect datacenter header
-            if line.startswith('Datacenter:'):
-                dc_name = line.split(':')[1].strip()
-                current_dc = dc_name
-                
-                if dc_name not in self.datacenters:
-                    self.datacenters[dc_name] = DatacenterInfo(name=dc_name)
-                
-                # Find the Address header for this DC
-                i += 1
-                while i < len(lines) and not lines[i].strip().startswith('Address'):
-                    i += 1
-                
-                # Skip the Address header line
-                i += 1
-                
-                # Parse tokens for this datacenter
-                while i < len(lines):
-                    line = lines[i].strip()
+        try:
+            with open(self.filepath, 'r') as f:
+                # Single forward pass; each line is dropped once it is parsed
+                for line in f:
+                    # Only trailing whitespace (newline, CR) is dropped; the
+                    # header checks are plain prefix slices and split()
+                    # ignores any leading indentation
+                    line = line.rstrip()
                     
-                    # Stop if we hit another datacenter or end of file
-                    if not line or line.startswith('Datacenter:'):
-                        break
+                    # Detect datacenter header
+                    if line[:11] == 'Datacenter:':
+                        dc_name = line.split(':')[1].strip()
+                        current_dc = dc_name
+                        
+                        if dc_name not in self.datacenters:
+                            self.datacenters[dc_name] = DatacenterInfo(name=dc_name)
+                        
+                        # Find the Address header for this DC
+                        state = self._SEEKING_HEADER
+                        continue
+                    
+                    if state == self._SEEKING_HEADER:
+                        if line[:7] == 'Address':
+                            state = self._PARSING_TOKENS
+                        continue
                     
-                    # Parse token line
-                    parts = line.split()
+                    if state != self._PARSING_TOKENS:
+                        continue
                     
-                    # Skip orphaned tokens
-                    if len(parts) == 1:
-                        i += 1
+                    # A blank line ends this datacenter's token block
+                    if not line:
+                        state = self._SEEKING_DC
                         continue
                     
-                    if len(parts) >= 7:
-                        try:
-                            address = parts[0]
-                            rack = parts[1]
-                            status = parts[2]
-                            state = parts[3]
-                            load = f"{parts[4]} {parts[5]}"
-                            owns = parts[6]
-                            
-                            if len(parts) >= 8:
-                                token = int(parts[7])
-                            else:
-                                i += 1
-                                continue
-                            
-                            token_entry = TokenEntry(
-                                address=address,
-                                rack=rack,
-                                status=status,
-                                state=state,
-                                load=load,
-                                owns=owns,
-                                token=token
-                            )
-                            self.datacenters[current_dc].tokens.append(token_entry)
-                        except (ValueError, IndexError):
-                            pass
+                    # Parse token line; the capped split leaves any trailing
+                    # columns unsplit in parts[8]
+                    parts = line.split(None, 8)
                     
-                    i += 1
-                continue
-            
-            i += 1
+                    # Skip orphaned tokens (an indented bare token value) and
+                    # other lines without a token column
+                    if len(parts) < 8:
+                        continue
+                    
+                    try:
+                        token_entry = TokenEntry(
+                            address=parts[0],
+                            rack=parts[1],
+                            status=parts[2],
+                            state=parts[3],
+                            load=f"{parts[4]} {parts[5]}",
+                            owns=parts[6],
+                            token=int(parts[7])
+                        )
+                        self.datacenters[current_dc].tokens.append(token_entry)
+                    except (ValueError, IndexError):
+                        pass
+        except FileNotFoundError:
+            raise FileNotFoundError(f"Ring file '{self.filepath}' not found")
+        except (OSError, UnicodeDecodeError) as e:
+            raise Exception(f"Error reading file: {e}")
         
         if not self.datacenters:
             raise ValueError("No datacenters found in ring file")
@@ -123,27 +115,48 @@ class MultiDCRingParser:
         
         return self.datacenters
     
-    def analyze_all_datacenters(self) -> Dict[str, DatacenterInfo]:
+    def analyze_all_datacenters(self, max_workers: Optional[int] = None) -> Dict[str, DatacenterInfo]:
         """
         Analyze token distribution for all datacenters.
+        Datacenters are independent, so with two or more they are analyzed
+        in parallel worker processes.
+        
+        Args:
+            max_workers: Worker process count (defaults to one per DC, up to
+                the CPU count); 1 analyzes serially
         
         Returns:
             Updated datacenters dictionary with ranges and statistics
         """
-        for dc_name, dc_info in self.datacenters.items():
-            if not dc_info.tokens:
-                continue
-            
-            # Analyze this datacenter
-            analyzer = TokenAnalyzer(dc_info.tokens)
-            dc_info.ranges = analyzer.calculate_ranges()
-            dc_info.ranges = analyzer.detect_gaps(dc_info.ranges)
-            dc_info.stats = analyzer.calculate_statistics(dc_info.ranges)
-            dc_info.stats['datacenter'] = dc_name
+        pending = [dc_info for dc_info in self.datacenters.values() if dc_info.tokens]
+        
+        if len(pending) < 2 or max_workers == 1:
+            results = [_analyze_one(dc_info) for dc_info in pending]
+        else:
+            if max_workers is None:
+                max_workers = min(len(pending), os.cpu_count() or 1)
+            with ProcessPoolExecutor(max_workers=max_workers) as executor:
+                results = list(executor.map(_analyze_one, pending))
+        
+        # Copy results back so existing DatacenterInfo references stay valid
+        for dc_info, result in zip(pending, results):
+            dc_info.ranges = result.ranges
+            dc_info.stats = result.stats
         
         return self.datacenters
 
 
+def _analyze_one(dc_info: DatacenterInfo) -> DatacenterInfo:
+    """Analyze one datacenter; module level so worker processes can pickle it."""
+    # Ranges and gaps come from the analyzer's sorted NumPy token arrays in
+    # one fused pass
+    analyzer = TokenAnalyzer(dc_info.tokens)
+    dc_info.ranges = analyzer.calculate_ranges_with_gaps()
+    dc_info.stats = analyzer.calculate_statistics(dc_info.ranges)
+    dc_info.stats['datacenter'] = dc_info.name
+    return dc_info
+
+
 class MultiDCVisualizer:
     """Visualizes multiple datacenters in a single view."""
     
@@ -151,16 +164,26 @@ class MultiDCVisualizer:
     MIN_TOKEN = -(2**63)
     MAX_TOKEN = 2**63 - 1
     
+    # Range edge colors (RGBA), indexed by is-gap
+    _EDGE_COLORS = np.array([(0.0, 0.0, 0.0, 0.8), (1.0, 0.0, 0.0, 0.5)], dtype=np.float32)
+    
     def __init__(self):
         self.color_map = {}
+        self.node_index: Dict[str, int] = {}
+        self.palette = np.empty((0, 4), dtype=np.float32)
+        # Degrees per token step, hoisted out of the angle conversions
+        self._angle_scale = 360.0 / (self.MAX_TOKEN - self.MIN_TOKEN)
     
     def token_to_angle(self, token_value: int) -> float:
         """Convert token value to angle in degrees (0-360)."""
-        normalized = (token_value - self.MIN_TOKEN) / (self.MAX_TOKEN - self.MIN_TOKEN)
-        return normalized * 360
+        return (token_value - self.MIN_TOKEN) * self._angle_scale
+    
+    def tokens_to_angles(self, tokens_np: np.ndarray) -> np.ndarray:
+        """Convert an array of token values to angles in degrees (0-360)."""
+        return (tokens_np.astype(np.float64) - self.MIN_TOKEN) * self._angle_scale
     
     def create_multi_dc_plot(self, datacenters: Dict[str, DatacenterInfo], 
-                            figsize: Tuple[int, int] = (16, 12)) -> plt.Figure:
+                            figsize: Tuple[int, int] = (16, 12)) -> 'plt.Figure':
         """
         Create visualization showing all datacenters.
         
@@ -171,42 +194,29 @@ class MultiDCVisualizer:
         Returns:
             matplotlib Figure object
         """
+        import matplotlib.pyplot as plt
+        
         n_dcs = len(datacenters)
         
-        # Create subplots - one for each datacenter
-        if n_dcs == 1:
-            fig, axes = plt.subplots(1, 1, figsize=figsize, subplot_kw=dict(projection='polar'))
-            axes = [axes]
-        elif n_dcs == 2:
-            fig, axes = plt.subplots(1, 2, figsize=figsize, subplot_kw=dict(projection='polar'))
-        elif n_dcs <= 4:
-            fig, axes = plt.subplots(2, 2, figsize=figsize, subplot_kw=dict(projection='polar'))
-            axes = axes.flatten()
-        else:
-            rows = (n_dcs + 2) // 3
-            fig, axes = plt.subplots(rows, 3, figsize=figsize, subplot_kw=dict(projection='polar'))
-            axes = axes.flatten()
+        # Create subplots - one for each datacenter, in up to 3 columns
+        # (2 columns for up to 4 DCs); unused grid cells are removed
+        cols = 1 if n_dcs <= 1 else 2 if n_dcs <= 4 else 3
+        rows = max(1, (n_dcs + cols - 1) // cols)
+        fig, grid = plt.subplots(rows, cols, figsize=figsize, squeeze=False)
+        axes = list(grid.flat)
+        for ax in axes[n_dcs:]:
+            fig.delaxes(ax)
         
-        # Assign colors globally across all DCs
-        all_nodes = set()
-        for dc_info in datacenters.values():
-            for token in dc_info.tokens:
-                all_nodes.add(token.address)
+        # Assign colors globally across all DCs, from each DC's per-node stats
+        all_nodes = set().union(*(dc.stats.get('nodes', {}).keys() for dc in datacenters.values()))
         
+        # Sorted once; the legend reuses this order via node_index
         self._assign_colors(sorted(all_nodes))
         
         # Plot each datacenter
-        for idx, (dc_name, dc_info) in enumerate(datacenters.items()):
-            if idx >= len(axes):
-                break
-            
-            ax = axes[idx]
+        for ax, dc_info in zip(axes, datacenters.values()):
             self._plot_single_dc(ax, dc_info)
         
-        # Hide unused subplots
-        for idx in range(len(datacenters), len(axes)):
-            axes[idx].set_visible(False)
-        
         fig.suptitle('Multi-Datacenter Token Ring Distribution', 
                     fontsize=18, fontweight='bold', y=0.98)
         
@@ -218,6 +228,9 @@ class MultiDCVisualizer:
     
     def _assign_colors(self, nodes: List[str]):
         """Assign distinct colors to nodes."""
+        import matplotlib.pyplot as plt
+        import matplotlib.colors as mcolors
+        
         n_nodes = len(nodes)
         
         if n_nodes <= 10:
@@ -231,83 +244,102 @@ class MultiDCVisualizer:
             self.color_map[node] = colors[i % len(colors)]
         
         self.color_map['GAP'] = (1.0, 1.0, 1.0)
+        
+        # RGBA lookup table for plotting: one row per node index with the
+        # range alpha applied, GAP as the last row
+        self.node_index = {node: i for i, node in enumerate(nodes)}
+        palette = mcolors.to_rgba_array([self.color_map[node] for node in list(nodes) + ['GAP']])
+        palette[:-1, 3] = 0.8
+        palette[-1, 3] = 0.5
+        self.palette = palette.astype(np.float32)
     
     def _plot_single_dc(self, ax, dc_info: DatacenterInfo):
         """Plot a single datacenter on the given axis."""
-        ax.set_theta_zero_location('N')
-        ax.set_theta_direction(-1)
-        ax.set_ylim(0, 1)
-        ax.set_yticks([])
-        ax.set_xticks([])
-        ax.spines['polar'].set_visible(False)
-        
-        # Draw ranges
-        for range_obj in dc_info.ranges:
-            start_angle = self.token_to_angle(range_obj.start_token)
-            end_angle = self.token_to_angle(range_obj.end_token)
-            
-            if end_angle < start_angle:
-                end_angle += 360
-            
-            start_rad = np.deg2rad(start_angle)
-            end_rad = np.deg2rad(end_angle)
-            
-            if range_obj.is_gap:
-                color = self.color_map['GAP']
-                alpha = 0.5
-                edgecolor = 'red'
-                linewidth = 2
-            else:
-                color = self.color_map[range_obj.owner]
-                alpha = 0.8
-                edgecolor = 'black'
-                linewidth = 0.5
-            
-            theta = np.linspace(start_rad, end_rad, 100)
-            r_inner = 0.6
-            r_outer = 1.0
-            
-            ax.fill_between(theta, r_inner, r_outer, 
-                          color=color, alpha=alpha,
-                          edgecolor=edgecolor, linewidth=linewidth)
+        import matplotlib.patches as mpatches
+        from matplotlib.collections import PatchCollection
+        
+        # Wedges are drawn on a plain Cartesian axes, as in the single-ring
+        # plot; analytic Wedges render much faster than sampled polar fills
+        ax.set_aspect('equal')
+        ax.set_xlim(-1.02, 1.02)
+        ax.set_ylim(-1.02, 1.02)
+        ax.axis('off')
+        
+        r_inner = 0.6
+        r_outer = 1.0
+        
+        ranges = dc_info.ranges
+        n_ranges = len(ranges)
+        start_angles = self.tokens_to_angles(
+            np.fromiter((r.start_token for r in ranges), dtype=np.int64, count=n_ranges))
+        end_angles = self.tokens_to_angles(
+            np.fromiter((r.end_token for r in ranges), dtype=np.int64, count=n_ranges))
+        
+        # Handle wrap-around
+        end_angles = np.where(end_angles < start_angles, end_angles + 360, end_angles)
+        
+        # Colors by owner index; gaps map to the GAP row and are styled apart
+        gap_idx = len(self.node_index)
+        owner_idx = np.fromiter((gap_idx if r.is_gap else self.node_index.get(r.owner, -1)
+                                 for r in ranges), dtype=np.int32, count=n_ranges)
+        is_gap = owner_idx == gap_idx
+        
+        face_colors = self.palette[owner_idx]
+        edge_colors = self._EDGE_COLORS[is_gap.view(np.int8)]
+        linewidths = np.where(is_gap, 2, 0.5)
+        
+        # Ring angles run clockwise from 0° at top; Wedge angles run
+        # counter-clockwise from the positive x axis
+        wedges = [
+            mpatches.Wedge((0, 0), r_outer, 90 - end_angle, 90 - start_angle,
+                           width=r_outer - r_inner)
+            for start_angle, end_angle in zip(start_angles.tolist(), end_angles.tolist())
+        ]
+        
+        # Draw all ranges as a single collection
+        collection = PatchCollection(wedges)
+        collection.set_facecolors(face_colors)
+        collection.set_edgecolors(edge_colors)
+        collection.set_linewidths(linewidths)
+        ax.add_collection(collection)
         
         # Add title with stats
         stats = dc_info.stats
         title = f"{dc_info.name}\n{len(stats.get('nodes', {}))} nodes, {stats.get('total_tokens', 0)} tokens"
         ax.set_title(title, fontsize=12, fontweight='bold', pad=15)
     
+    # Above this many nodes the legend switches to a compact two-column layout
+    COMPACT_LEGEND_NODES = 40
+    
     def _add_global_legend(self, fig, datacenters: Dict[str, DatacenterInfo]):
         """Add a global legend for all nodes."""
-        legend_elements = []
+        import matplotlib.patches as mpatches
         
         # Collect all unique nodes
-        all_nodes = {}
-        for dc_info in datacenters.values():
-            for node, node_stats in dc_info.stats.get('nodes', {}).items():
-                if node not in all_nodes:
-                    all_nodes[node] = {
-                        'token_count': 0,
-                        'load': node_stats['load'],
-                        'dcs': []
-                    }
-                all_nodes[node]['token_count'] += node_stats['token_count']
-                all_nodes[node]['dcs'].append(dc_info.name)
-        
-        # Create legend entries
-        for node in sorted(all_nodes.keys()):
+        all_nodes = aggregate_nodes(datacenters)[0]
+        compact = len(all_nodes) > self.COMPACT_LEGEND_NODES
+        n_dcs = len(datacenters)
+        
+        def label(node: str) -> str:
             node_info = all_nodes[node]
-            color = self.color_map[node]
+            # Compact labels leave out the DC list for nodes present in every DC
+            if compact and len(node_info['dcs']) == n_dcs:
+                return f"{node}: {node_info['token_count']} tokens"
             dcs_str = ', '.join(node_info['dcs'])
-            label = f"{node} ({dcs_str}): {node_info['token_count']} tokens"
-            legend_elements.append(
-                mpatches.Patch(facecolor=color, edgecolor='black', label=label)
-            )
+            return f"{node} ({dcs_str}): {node_info['token_count']} tokens"
+        
+        # Create legend entries, in the sorted order colors were assigned in
+        legend_elements = [
+            mpatches.Patch(facecolor=self.color_map[node], edgecolor='black', label=label(node))
+            for node in self.node_index
+        ]
         
         fig.legend(handles=legend_elements, loc='center left',
-                  bbox_to_anchor=(1.0, 0.5), fontsize=9, frameon=True)
+                  bbox_to_anchor=(1.0, 0.5), fontsize=7 if compact else 9,
+                  ncol=2 if compact else 1, frameon=True)
     
     def create_comparison_plot(self, datacenters: Dict[str, DatacenterInfo],
-                              figsize: Tuple[int, int] = (14, 10)) -> plt.Figure:
+                              figsize: Tuple[int, int] = (14, 10)) -> 'plt.Figure':
         """
         Create a comparison plot showing balance metrics across datacenters.
         
@@ -318,13 +350,15 @@ class MultiDCVisualizer:
         Returns:
             matplotlib Figure object
         """
+        import matplotlib.pyplot as plt
+        
         fig, axes = plt.subplots(2, 2, figsize=figsize)
         
-        dc_names = list(datacenters.keys())
+        _, dc_names, token_counts, balance_scores, gap_percentages, node_counts = \
+            aggregate_nodes(datacenters)
         
         # 1. Token distribution per DC
         ax1 = axes[0, 0]
-        token_counts = [len(dc.tokens) for dc in datacenters.values()]
         ax1.bar(dc_names, token_counts, color='steelblue', alpha=0.7)
         ax1.set_title('Token Count per Datacenter', fontweight='bold')
         ax1.set_ylabel('Number of Tokens')
@@ -332,8 +366,8 @@ class MultiDCVisualizer:
         
         # 2. Balance scores
         ax2 = axes[0, 1]
-        balance_scores = [dc.stats.get('balance_score', 0) for dc in datacenters.values()]
-        colors = ['green' if s > 0.9 else 'orange' if s > 0.7 else 'red' for s in balance_scores]
+        colors = np.where(balance_scores > 0.9, 'green',
+                          np.where(balance_scores > 0.7, 'orange', 'red'))
         ax2.bar(dc_names, balance_scores, color=colors, alpha=0.7)
         ax2.set_title('Balance Score per Datacenter', fontweight='bold')
         ax2.set_ylabel('Balance Score (1.0 = perfect)')
@@ -345,7 +379,6 @@ class MultiDCVisualizer:
         
         # 3. Gap percentage
         ax3 = axes[1, 0]
-        gap_percentages = [dc.stats.get('gap_percentage', 0) for dc in datacenters.values()]
         ax3.bar(dc_names, gap_percentages, color='coral', alpha=0.7)
         ax3.set_title('Gap Percentage per Datacenter', fontweight='bold')
         ax3.set_ylabel('Gap Percentage (%)')
@@ -353,7 +386,6 @@ class MultiDCVisualizer:
         
         # 4. Node count per DC
         ax4 = axes[1, 1]
-        node_counts = [len(dc.stats.get('nodes', {})) for dc in datacenters.values()]
         ax4.bar(dc_names, node_counts, color='mediumseagreen', alpha=0.7)
         ax4.set_title('Node Count per Datacenter', fontweight='bold')
         ax4.set_ylabel('Number of Nodes')
@@ -365,6 +397,46 @@ class MultiDCVisualizer:
         return fig
 
 
+def aggregate_nodes(datacenters: Dict[str, DatacenterInfo]) -> Tuple[
+        Dict[str, Dict], List[str], np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Aggregate per-node and per-DC figures in a single pass over the datacenters.
+    
+    Returns:
+        Tuple of (nodes, dc_names, token_counts, balance_scores,
+        gap_percentages, node_counts); nodes maps each address to its total
+        token count, load and datacenter names, the arrays are per DC
+    """
+    all_nodes = {}
+    n_dcs = len(datacenters)
+    token_counts = np.empty(n_dcs, dtype=np.int64)
+    balance_scores = np.empty(n_dcs)
+    gap_percentages = np.empty(n_dcs)
+    node_counts = np.empty(n_dcs, dtype=np.int64)
+    
+    for i, dc_info in enumerate(datacenters.values()):
+        stats = dc_info.stats
+        dc_nodes = stats.get('nodes', {})
+        
+        token_counts[i] = len(dc_info.tokens)
+        balance_scores[i] = stats.get('balance_score', 0)
+        gap_percentages[i] = stats.get('gap_percentage', 0)
+        node_counts[i] = len(dc_nodes)
+        
+        for node, node_stats in dc_nodes.items():
+            if node not in all_nodes:
+                all_nodes[node] = {
+                    'token_count': 0,
+                    'load': node_stats['load'],
+                    'dcs': []
+                }
+            all_nodes[node]['token_count'] += node_stats['token_count']
+            all_nodes[node]['dcs'].append(dc_info.name)
+    
+    return (all_nodes, list(datacenters.keys()), token_counts, balance_scores,
+            gap_percentages, node_counts)
+
+
 def print_multi_dc_statistics(datacenters: Dict[str, DatacenterInfo]):
     """Print comprehensive statistics for all datacenters."""
     print("\n" + "="*70)
@@ -381,14 +453,13 @@ def print_multi_dc_statistics(datacenters: Dict[str, DatacenterInfo]):
         print(f"Total Tokens: {stats.get('total_tokens', 0)}")
         
         print("\nNode Distribution:")
-        for node in sorted(stats.get('nodes', {}).keys()):
+        for node in stats.get('nodes_sorted', []):
             node_stats = stats['nodes'][node]
             print(f"  {node}: {node_stats['token_count']} tokens "
                   f"({node_stats['coverage_percentage']:.2f}%) - Load: {node_stats['load']}")
         
         print(f"\nToken Space Coverage:")
-        total_coverage = sum(n['coverage_percentage'] for n in stats.get('nodes', {}).values())
-        print(f"  Owned: {total_coverage:.2f}%")
+        print(f"  Owned: {stats.get('total_coverage', 0):.2f}%")
         print(f"  Gaps: {stats.get('gap_percentage', 0):.2f}% "
               f"({stats.get('gap_count', 0)} gaps detected)")
         
@@ -412,6 +483,8 @@ if __name__ == '__main__':
                        help='Image resolution (default: 300)')
     parser.add_argument('--show', action='store_true',
                        help='Display plot interactively')
+    parser.add_argument('--fast-png', action='store_true',
+                       help='Write PNGs with fast zlib level 1 (larger files, much faster at high DPI)')
     
     args = parser.parse_args()
     
@@ -434,9 +507,16 @@ if __name__ == '__main__':
         output_file = args.output
     
     if args.show:
+        import matplotlib.pyplot as plt
         plt.show()
     
-    fig.savefig(output_file, dpi=args.dpi, bbox_inches='tight', facecolor='white')
+    # PNG encoding dominates save time at high DPI with many DCs; zlib
+    # level 1 is still lossless
+    save_kwargs = {}
+    if args.fast_png and os.path.splitext(output_file)[1].lower() in ('', '.png'):
+        save_kwargs['pil_kwargs'] = {'compress_level': 1}
+    
+    fig.savefig(output_file, dpi=args.dpi, bbox_inches='tight', facecolor='white', **save_kwargs)
     print(f"Visualization saved to: {output_file}")
 
 # Made with Bob
@@ -0,0 +1,302 @@
+"""
+Numba Utilities
+Optional JIT-compiled kernels for the ring analyzers.
+Each kernel has a NumPy fallback with the same signature, used when numba
+is not installed.
+"""
+
+import numpy as np
+
+try:
+    from numba import njit, prange
+    HAVE_NUMBA = True
+except ImportError:
+    HAVE_NUMBA = False
+
+
+if HAVE_NUMBA:
+    @njit(cache=True)
+    def compute_range_sizes(tokens):
+        """Ring distance from each sorted int64 token to the next, wrapping at the end."""
+        n = tokens.shape[0]
+        sizes = np.empty(n, dtype=np.uint64)
+        for i in range(n):
+            j = i + 1 if i + 1 < n else 0
+            # uint64 subtraction wraps modulo 2**64
+            sizes[i] = np.uint64(tokens[j]) - np.uint64(tokens[i])
+        return sizes
+else:
+    def compute_range_sizes(tokens):
+        """Ring distance from each sorted int64 token to the next, wrapping at the end."""
+        # uint64 subtraction wraps modulo 2**64
+        return np.roll(tokens, -1).view(np.uint64) - tokens.view(np.uint64)
+
+
+if HAVE_NUMBA:
+    @njit(cache=True)
+    def mean_std(values):
+        """Mean and population standard deviation in one pass (Welford)."""
+        mean = 0.0
+        m2 = 0.0
+        for i in range(values.shape[0]):
+            x = float(values[i])
+            delta = x - mean
+            mean += delta / (i + 1)
+            m2 += delta * (x - mean)
+        return mean, np.sqrt(m2 / values.shape[0])
+else:
+    def mean_std(values):
+        """Mean and population standard deviation in one pass (Welford)."""
+        values = values.astype(np.float64)
+        return float(values.mean()), float(values.std())
+
+
+if HAVE_NUMBA:
+    @njit(parallel=True, cache=True)
+    def build_wedges(starts_deg, spans_deg, n_points, r_in, r_out):
+        """
+        Closed annular wedge outlines as flat, NaN-separated x/y arrays.
+        
+        Wedge i is n_points[i] inner arc points, the outer arc reversed, the
+        first inner point again and a NaN separator (2 * n_points[i] + 2 entries).
+        """
+        m = starts_deg.shape[0]
+        offsets = np.empty(m + 1, dtype=np.int64)
+        offsets[0] = 0
+        for i in range(m):
+            offsets[i + 1] = offsets[i] + 2 * n_points[i] + 2
+        x = np.empty(offsets[m])
+        y = np.empty(offsets[m])
+        for i in prange(m):
+            n = n_points[i]
+            o = offsets[i]
+            start = np.deg2rad(starts_deg[i])
+            step = np.deg2rad(spans_deg[i]) / (n - 1)
+            for k in range(n):
+                c = np.cos(start + step * k)
+                s = np.sin(start + step * k)
+                x[o + k] = r_in * c
+                y[o + k] = r_in * s
+                x[o + 2 * n - 1 - k] = r_out * c
+                y[o + 2 * n - 1 - k] = r_out * s
+            x[o + 2 * n] = x[o]
+            y[o + 2 * n] = y[o]
+            x[o + 2 * n + 1] = np.nan
+            y[o + 2 * n + 1] = np.nan
+        return x, y
+else:
+    def build_wedges(starts_deg, spans_deg, n_points, r_in, r_out):
+        """
+        Closed annular wedge outlines as flat, NaN-separated x/y arrays.
+        
+        Wedge i is n_points[i] inner arc points, the outer arc reversed, the
+        first inner point again and a NaN separator (2 * n_points[i] + 2 entries).
+        """
+        lengths = 2 * n_points + 2
+        wedge = np.repeat(np.arange(len(lengths)), lengths)
+        pos = np.arange(lengths.sum()) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+        n = n_points[wedge]
+        
+        # Arc step along the wedge and which ring edge each point sits on
+        outer = (pos >= n) & (pos < 2 * n)
+        step = np.where(outer, 2 * n - 1 - pos, np.where(pos < n, pos, 0))
+        radius = np.where(outer, r_out, r_in)
+        theta = np.deg2rad(starts_deg[wedge] + spans_deg[wedge] * (step / (n - 1)))
+        
+        x = radius * np.cos(theta)
+        y = radius * np.sin(theta)
+        separator = pos == 2 * n + 1
+        x[separator] = np.nan
+        y[separator] = np.nan
+        return x, y
+
+
+# The token space splits into 2**BUCKET_BITS equal buckets by the top bits
+# of each token; bucket b starts at -2**63 + b * 2**BUCKET_SHIFT
+BUCKET_BITS = 12
+BUCKET_SHIFT = 64 - BUCKET_BITS
+
+# Reciprocal of the 2**64 token space; exact, so multiplying by it matches
+# dividing by 2**64
+INV_TOKEN_SPACE = 2.0 ** -64
+
+
+def token_bucket(token):
+    """Bucket of an int64 token (Python int or NumPy array)."""
+    # Arithmetic shift floors, so the signed range maps onto 0..2**BUCKET_BITS-1
+    return (token >> BUCKET_SHIFT) + (1 << (BUCKET_BITS - 1))
+
+
+def range_buckets(range_starts):
+    """
+    Bucket grid for range lookups over sorted int64 range starts.
+    
+    Entry b is the last range starting at or before bucket b's lower bound
+    (-1 if none), with a final entry for the last range. The last range
+    starting at or before a token in bucket b then lies in
+    [grid[b], grid[b + 1]], usually a single candidate.
+    """
+    n_buckets = 1 << BUCKET_BITS
+    bounds = np.int64(-2**63) + np.arange(n_buckets, dtype=np.int64) * (1 << BUCKET_SHIFT)
+    grid = np.empty(n_buckets + 1, dtype=np.int64)
+    grid[:n_buckets] = np.searchsorted(range_starts, bounds, side='right') - 1
+    grid[n_buckets] = len(range_starts) - 1
+    return grid
+
+
+if HAVE_NUMBA:
+    @njit(cache=True)
+    def _range_index(token, range_starts, range_spans, bucket_grid):
+        """Index of the range containing token, or -1; see movement_impacts."""
+        n_ranges = range_starts.shape[0]
+        if n_ranges == 0:
+            return -1
+        # Last range starting at or before the token, searched only within
+        # the token's bucket
+        b = (token >> BUCKET_SHIFT) + (1 << (BUCKET_BITS - 1))
+        lo = bucket_grid[b] + 1
+        hi = bucket_grid[b + 1] + 1
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if range_starts[mid] <= token:
+                lo = mid + 1
+            else:
+                hi = mid
+        # Before the first start, that is the last range, which wraps
+        idx = (lo - 1) % n_ranges
+        # uint64 subtraction wraps modulo 2**64
+        if np.uint64(token) - np.uint64(range_starts[idx]) >= range_spans[idx]:
+            return -1
+        return idx
+    
+    @njit(cache=True)
+    def movement_impacts(tokens, improvements, range_starts, range_spans,
+                         range_sizes, bucket_grid):
+        """
+        Impact score of moving each token, whose move improves balance by
+        improvements[i], weighted by its range size; 0 where no range
+        contains it.
+        
+        Ranges are given as int64 starts sorted by start, uint64 spans
+        (end - start modulo 2**64, so the wrap-around range needs no special
+        case) and sizes, and their range_buckets grid.
+        """
+        m = tokens.shape[0]
+        scores = np.zeros(m)
+        for i in range(m):
+            idx = _range_index(tokens[i], range_starts, range_spans, bucket_grid)
+            if idx < 0:
+                continue
+            
+            range_size_factor = float(range_sizes[idx]) * INV_TOKEN_SPACE
+            scores[i] = improvements[i] * (1 + range_size_factor * 10)
+        return scores
+else:
+    def movement_impacts(tokens, improvements, range_starts, range_spans,
+                         range_sizes, bucket_grid):
+        """
+        Impact score of moving each token, whose move improves balance by
+        improvements[i], weighted by its range size; 0 where no range
+        contains it.
+        
+        Ranges are given as int64 starts sorted by start, uint64 spans
+        (end - start modulo 2**64, so the wrap-around range needs no special
+        case) and sizes, and their range_buckets grid.
+        """
+        # A whole-array searchsorted is already a C loop, so the bucket grid
+        # is only needed by the compiled kernel
+        if not len(range_starts):
+            return np.zeros(len(tokens))
+        
+        # Last range starting at or before each token; before the first
+        # start, that is the last range, which wraps. uint64 subtraction
+        # wraps modulo 2**64
+        idx = (np.searchsorted(range_starts, tokens, side='right') - 1) % len(range_starts)
+        found = tokens.view(np.uint64) - range_starts[idx].view(np.uint64) < range_spans[idx]
+        
+        range_size_factor = range_sizes[idx] * INV_TOKEN_SPACE
+        return np.where(found, improvements * (1 + range_size_factor * 10), 0.0)
+
+
+if HAVE_NUMBA:
+    @njit(parallel=True, cache=True)
+    def suggest_movements(node_tokens, node_offsets, sources, improvements, k,
+                          range_starts, range_spans, range_sizes, bucket_grid):
+        """
+        Candidate token movements and their impact scores.
+        
+        Source i (node sources[i], whose sorted tokens are
+        node_tokens[node_offsets[n]:node_offsets[n + 1]]) gives one token to
+        each sink column of improvements in turn, middle token first, until
+        its tokens run out; sources are taken in order until k candidates
+        are made. Returns (tokens, rows, columns, scores), with scores as in
+        movement_impacts.
+        """
+        n_sources = sources.shape[0]
+        n_sinks = improvements.shape[1]
+        
+        # First output slot of each source
+        slots = np.empty(n_sources + 1, dtype=np.int64)
+        slots[0] = 0
+        for i in range(n_sources):
+            n_tokens = node_offsets[sources[i] + 1] - node_offsets[sources[i]]
+            slots[i + 1] = min(slots[i] + min(n_sinks, n_tokens), max(k, 0))
+        
+        m = slots[n_sources]
+        tokens = np.empty(m, dtype=np.int64)
+        rows = np.empty(m, dtype=np.int64)
+        columns = np.empty(m, dtype=np.int64)
+        scores = np.zeros(m)
+        for i in prange(n_sources):
+            first = node_offsets[sources[i]]
+            n_tokens = node_offsets[sources[i] + 1] - first
+            for j in range(slots[i + 1] - slots[i]):
+                # Picking the middle remaining token each time alternates
+                # outwards from the middle, starting on the side set by the
+                # parities of j and n_tokens
+                step = (j + 1) // 2
+                if (j ^ n_tokens) & 1:
+                    step = -step
+                token = node_tokens[first + n_tokens // 2 + step]
+                
+                o = slots[i] + j
+                tokens[o] = token
+                rows[o] = i
+                columns[o] = j
+                idx = _range_index(token, range_starts, range_spans, bucket_grid)
+                if idx >= 0:
+                    range_size_factor = float(range_sizes[idx]) * INV_TOKEN_SPACE
+                    scores[o] = improvements[i, j] * (1 + range_size_factor * 10)
+        return tokens, rows, columns, scores
+else:
+    def suggest_movements(node_tokens, node_offsets, sources, improvements, k,
+                          range_starts, range_spans, range_sizes, bucket_grid):
+        """
+        Candidate token movements and their impact scores.
+        
+        Source i (node sources[i], whose sorted tokens are
+        node_tokens[node_offsets[n]:node_offsets[n + 1]]) gives one token to
+        each sink column of improvements in turn, middle token first, until
+        its tokens run out; sources are taken in order until k candidates
+        are made. Returns (tokens, rows, columns, scores), with scores as in
+        movement_impacts.
+        """
+        first = node_offsets[sources]
+        n_tokens = node_offsets[sources + 1] - first
+        
+        # Candidates per source, cut off once k are made
+        ends = np.minimum(np.cumsum(np.minimum(n_tokens, improvements.shape[1])), max(k, 0))
+        counts = np.diff(ends, prepend=0)
+        rows = np.repeat(np.arange(len(sources)), counts)
+        columns = np.arange(len(rows)) - np.repeat(ends - counts, counts)
+        
+        # Picking the middle remaining token each time alternates outwards
+        # from the middle, starting on the side set by the parities of the
+        # column and the token count
+        n = n_tokens[rows]
+        step = np.where((columns ^ n) & 1, -((columns + 1) // 2), (columns + 1) // 2)
+        tokens = node_tokens[first[rows] + n // 2 + step]
+        
+        scores = movement_impacts(tokens, improvements[rows, columns], range_starts,
+                                  range_spans, range_sizes, bucket_grid)
+        return tokens, rows, columns, scores
@@ -5,12 +5,28 @@ Analyzes ring imbalances and provides recommendations for token rebalancing.
 """
 
 from typing import List, Dict, Tuple, Optional
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+import heapq
+import operator
+import sys
 import numpy as np
 from cassandra_ring_analyzer import TokenEntry, TokenRange, RingParser, TokenAnalyzer
+from numba_utils import range_buckets, suggest_movements
 
 
-@dataclass
+# dataclass(slots=True) needs Python 3.10; older versions keep a __dict__
+_DATACLASS_SLOTS = {'slots': True} if sys.version_info >= (3, 10) else {}
+
+# Recommendation priorities, in the order their sort key ranks them
+_PRIORITY_ORDER = {'high': 0, 'medium': 1, 'low': 2}
+
+# Node balance statuses by absolute deviation percentage; each bin edge is
+# the inclusive upper bound of the status before it
+_BALANCE_BINS = np.array([5.0, 10.0, 20.0])
+_BALANCE_STATUSES = np.array(['balanced', 'slightly_imbalanced', 'imbalanced', 'severely_imbalanced'])
+
+
+@dataclass(frozen=True, **_DATACLASS_SLOTS)
 class RebalancingRecommendation:
     """Represents a recommendation for rebalancing."""
     node: str
@@ -18,10 +34,25 @@ class RebalancingRecommendation:
     recommended_tokens: int
     change: int
     priority: str  # 'high', 'medium', 'low'
-    reason: str
+    deviation: float  # Tokens over (+) or under (-) the ideal count
+    deviation_percentage: float
+    # Ascending sort key, computed once at construction
+    _sort_key: Tuple[int, int] = field(init=False, repr=False, compare=False)
+    
+    def __post_init__(self):
+        # Frozen, so the derived field is set past the generated __setattr__
+        object.__setattr__(self, '_sort_key', (-_PRIORITY_ORDER[self.priority], -abs(self.change)))
+    
+    @property
+    def reason(self) -> str:
+        """Human-readable reason, formatted only when it is shown or exported."""
+        if self.deviation > 0:
+            return f"Node has {abs(self.deviation):.1f} more tokens than ideal ({abs(self.deviation_percentage):.1f}% over). Consider removing tokens."
+        else:
+            return f"Node has {abs(self.deviation):.1f} fewer tokens than ideal ({abs(self.deviation_percentage):.1f}% under). Consider adding tokens."
 
 
-@dataclass
+@dataclass(frozen=True, **_DATACLASS_SLOTS)
 class TokenMovement:
     """Represents a suggested token movement."""
     token_value: int
@@ -30,10 +61,31 @@ class TokenMovement:
     impact_score: float
 
 
+def movements_to_soa(movements: List[TokenMovement], node_index: Dict[str, int]) -> Dict[str, np.ndarray]:
+    """
+    Convert token movements to parallel arrays.
+    
+    Args:
+        movements: Token movements
+        node_index: Maps node addresses to their positions
+        
+    Returns:
+        Dictionary of 'token_value', 'from_idx', 'to_idx' and 'impact_score' arrays
+    """
+    n = len(movements)
+    return {
+        'token_value': np.fromiter((m.token_value for m in movements), dtype=np.int64, count=n),
+        'from_idx': np.fromiter((node_index[m.from_node] for m in movements), dtype=np.intp, count=n),
+        'to_idx': np.fromiter((node_index[m.to_node] for m in movements), dtype=np.intp, count=n),
+        'impact_score': np.fromiter((m.impact_score for m in movements), dtype=np.float64, count=n)
+    }
+
+
 class RebalancingAdvisor:
     """Analyzes ring balance and provides rebalancing recommendations."""
     
     TOKEN_SPACE = 2**64
+    _INV_TOKEN_SPACE = 1.0 / TOKEN_SPACE  # Exact, as TOKEN_SPACE is a power of two
     
     def __init__(self, tokens: List[TokenEntry], ranges: List[TokenRange], stats: Dict):
         self.tokens = tokens
@@ -41,15 +93,62 @@ class RebalancingAdvisor:
         self.stats = stats
         self.nodes = list(stats['nodes'].keys())
         self.n_nodes = len(self.nodes)
+        self.node_index = {node: i for i, node in enumerate(self.nodes)}
         self.total_tokens = len(tokens)
+        self._ideal_tokens = self.total_tokens / self.n_nodes if self.n_nodes else 0.0
+        
+        # Token count per node, in self.nodes order
+        self._counts = np.fromiter((stats['nodes'][node]['token_count'] for node in self.nodes),
+                                   dtype=np.int64, count=self.n_nodes)
+        
+        # Structure-of-arrays view of the tokens: values sorted with NumPy's
+        # argsort, owners encoded as indices into self.nodes
+        raw_tokens = np.fromiter((t.token for t in tokens), dtype=np.int64, count=self.total_tokens)
+        order = np.argsort(raw_tokens, kind='stable')
+        self._token_values = raw_tokens[order]
+        self._token_node_idx = np.fromiter((self.node_index[t.address] for t in tokens),
+                                           dtype=np.intp, count=self.total_tokens)[order]
+        
+        # Token values grouped by node, node i's sorted tokens being
+        # _node_tokens[_node_token_offsets[i]:_node_token_offsets[i + 1]];
+        # a stable sort by owner keeps every node's slice in token order
+        by_node = np.argsort(self._token_node_idx, kind='stable')
+        self._node_tokens = self._token_values[by_node]
+        self._node_token_offsets = np.zeros(self.n_nodes + 1, dtype=np.intp)
+        np.cumsum(np.bincount(self._token_node_idx, minlength=self.n_nodes),
+                  out=self._node_token_offsets[1:])
+        
+        # Range starts, spans and sizes sorted by start token, plus a
+        # token-space bucket grid that narrows each lookup to one or two
+        # candidates. Spans are end - start modulo 2**64, so a token is in a
+        # range exactly when token - start (also modulo 2**64) is below its
+        # span, wrap-around range included
+        n_ranges = len(ranges)
+        starts = np.fromiter((r.start_token for r in ranges), dtype=np.int64, count=n_ranges)
+        order = np.argsort(starts, kind='stable')
+        self._range_starts = starts[order]
+        ends = np.fromiter((r.end_token for r in ranges), dtype=np.int64, count=n_ranges)[order]
+        self._range_spans = ends.view(np.uint64) - self._range_starts.view(np.uint64)
+        self._range_sizes = np.fromiter((r.size for r in ranges), dtype=np.uint64,
+                                        count=n_ranges)[order]
+        self._bucket_grid = range_buckets(self._range_starts)
+        
+        # Analysis results, computed on first use; inputs never change after
+        # construction, so no invalidation is needed
+        self._analysis: Optional[Dict] = None
+        self._recommendations: Optional[List[RebalancingRecommendation]] = None
     
     def analyze_balance(self) -> Dict:
         """
         Perform comprehensive balance analysis.
         
         Returns:
-            Dictionary containing balance analysis results
+            Dictionary containing balance analysis results (cached and shared
+            between calls, so treat it as read-only)
         """
+        if self._analysis is not None:
+            return self._analysis
+        
         analysis = {
             'balance_score': self.stats['balance_score'],
             'is_balanced': self.stats['balance_score'] >= 0.9,
@@ -59,23 +158,27 @@ class RebalancingAdvisor:
         }
         
         # Ideal tokens per node
-        ideal_tokens_per_node = self.total_tokens / self.n_nodes
-        
-        # Analyze each node
-        for node in self.nodes:
-            node_stats = self.stats['nodes'][node]
-            current_tokens = node_stats['token_count']
-            deviation = current_tokens - ideal_tokens_per_node
-            deviation_pct = (deviation / ideal_tokens_per_node) * 100
-            
-            analysis['node_analysis'][node] = {
+        ideal_tokens_per_node = self._ideal_tokens
+        
+        # Analyze all nodes at once; same thresholds as _classify_node_balance
+        deviations = self._counts - ideal_tokens_per_node
+        deviation_pcts = (deviations / ideal_tokens_per_node) * 100
+        statuses = _BALANCE_STATUSES[np.digitize(np.abs(deviation_pcts), _BALANCE_BINS, right=True)]
+        
+        analysis['node_analysis'] = {
+            node: {
                 'current_tokens': current_tokens,
                 'ideal_tokens': ideal_tokens_per_node,
                 'deviation': deviation,
                 'deviation_percentage': deviation_pct,
-                'status': self._classify_node_balance(deviation_pct)
+                'status': status
             }
+            for node, current_tokens, deviation, deviation_pct, status in zip(
+                self.nodes, self._counts.tolist(), deviations.tolist(),
+                deviation_pcts.tolist(), statuses.tolist())
+        }
         
+        self._analysis = analysis
         return analysis
     
     def _calculate_imbalance_severity(self) -> str:
@@ -111,15 +214,20 @@ class RebalancingAdvisor:
         Generate rebalancing recommendations.
         
         Returns:
-            List of RebalancingRecommendation objects
+            List of RebalancingRecommendation objects (cached and shared
+            between calls, so treat it as read-only)
         """
+        if self._recommendations is not None:
+            return self._recommendations
+        
         recommendations = []
         analysis = self.analyze_balance()
         
         if analysis['is_balanced']:
+            self._recommendations = recommendations
             return recommendations
         
-        ideal_tokens = self.total_tokens / self.n_nodes
+        ideal_tokens = self._ideal_tokens
         
         for node, node_analysis in analysis['node_analysis'].items():
             deviation = node_analysis['deviation']
@@ -137,27 +245,22 @@ class RebalancingAdvisor:
             else:
                 priority = 'low'
             
-            # Generate reason
-            if deviation > 0:
-                reason = f"Node has {abs(deviation):.1f} more tokens than ideal ({abs(deviation_pct):.1f}% over). Consider removing tokens."
-            else:
-                reason = f"Node has {abs(deviation):.1f} fewer tokens than ideal ({abs(deviation_pct):.1f}% under). Consider adding tokens."
-            
             recommendation = RebalancingRecommendation(
                 node=node,
                 current_tokens=node_analysis['current_tokens'],
                 recommended_tokens=int(round(ideal_tokens)),
                 change=int(round(ideal_tokens - node_analysis['current_tokens'])),
                 priority=priority,
-                reason=reason
+                deviation=deviation,
+                deviation_percentage=deviation_pct
             )
             
             recommendations.append(recommendation)
         
         # Sort by priority
-        priority_order = {'high': 0, 'medium': 1, 'low': 2}
-        recommendations.sort(key=lambda r: (priority_order[r.priority], abs(r.change)), reverse=True)
+        recommendations.sort(key=operator.attrgetter('_sort_key'))
         
+        self._recommendations = recommendations
         return recommendations
     
     def suggest_token_movements(self, max_movements: int = 10) -> List[TokenMovement]:
@@ -170,92 +273,92 @@ class RebalancingAdvisor:
         Returns:
             List of TokenMovement objects
         """
-        movements = []
-        analysis = self.analyze_balance()
-        
-        # Identify over-allocated and under-allocated nodes
-        over_allocated = []
-        under_allocated = []
-        
-        for node, node_analysis in analysis['node_analysis'].items():
-            if node_analysis['deviation'] > 0:
-                over_allocated.append((node, node_analysis['deviation']))
-            elif node_analysis['deviation'] < 0:
-                under_allocated.append((node, abs(node_analysis['deviation'])))
-        
-        # Sort by deviation magnitude
-        over_allocated.sort(key=lambda x: x[1], reverse=True)
-        under_allocated.sort(key=lambda x: x[1], reverse=True)
-        
-        # Generate movement suggestions
-        for from_node, _ in over_allocated:
-            # Get tokens owned by this node
-            node_tokens = sorted([t.token for t in self.tokens if t.address == from_node])
-            
-            for to_node, _ in under_allocated:
-                if len(movements) >= max_movements:
-                    break
-                
-                # Suggest moving a token
-                if node_tokens:
-                    token_to_move = node_tokens[len(node_tokens) // 2]  # Pick middle token
-                    
-                    # Calculate impact score (higher is better)
-                    impact_score = self._calculate_movement_impact(token_to_move, from_node, to_node)
-                    
-                    movement = TokenMovement(
-                        token_value=token_to_move,
-                        from_node=from_node,
-                        to_node=to_node,
-                        impact_score=impact_score
-                    )
-                    
-                    movements.append(movement)
-                    node_tokens.remove(token_to_move)
-            
-            if len(movements) >= max_movements:
-                break
-        
-        # Sort by impact score
-        movements.sort(key=lambda m: m.impact_score, reverse=True)
+        deviations = self._counts - self._ideal_tokens
+        
+        # Identify over-allocated and under-allocated nodes, largest deviation
+        # first. Every source yields at least one candidate and the first
+        # source visits the sinks in order, so only the top max_movements of
+        # each can be used
+        over_idx = np.flatnonzero(deviations > 0)
+        under_idx = np.flatnonzero(deviations < 0)
+        over_allocated = over_idx[self._top_k(deviations[over_idx], max_movements)]
+        under_allocated = under_idx[self._top_k(-deviations[under_idx], max_movements)]
+        
+        over_nodes = [self.nodes[i] for i in over_allocated.tolist()]
+        under_nodes = [self.nodes[i] for i in under_allocated.tolist()]
+        
+        # Each source gives its middle tokens to the sinks in turn; all
+        # candidates and their impact scores (higher is better) come from
+        # one kernel, as positions into the two node lists
+        improvements = self._balance_improvements(over_allocated, under_allocated)
+        tokens, rows, columns, impact_scores = suggest_movements(
+            self._node_tokens, self._node_token_offsets, over_allocated, improvements,
+            max_movements, self._range_starts, self._range_spans, self._range_sizes,
+            self._bucket_grid)
+        
+        movements = (
+            TokenMovement(
+                token_value=token_to_move,
+                from_node=over_nodes[from_pos],
+                to_node=under_nodes[to_pos],
+                impact_score=impact_score
+            )
+            for token_to_move, from_pos, to_pos, impact_score in zip(
+                tokens.tolist(), rows.tolist(), columns.tolist(), impact_scores.tolist())
+        )
         
-        return movements[:max_movements]
+        # Top movements by impact score; ties keep candidate order, as a
+        # stable descending sort would
+        return heapq.nlargest(max_movements, movements, key=operator.attrgetter('impact_score'))
     
-    def _calculate_movement_impact(self, token: int, from_node: str, to_node: str) -> float:
+    @staticmethod
+    def _top_k(values: np.ndarray, k: int) -> np.ndarray:
         """
-        Calculate the impact score of moving a token.
-        Higher score means better balance improvement.
+        Positions of the k largest values, largest first. Ties keep their
+        original order, as a stable descending sort would.
         """
-        # Find the range this token belongs to
-        token_range = None
-        for r in self.ranges:
-            if r.start_token <= token < r.end_token or (r.end_token < r.start_token and (token >= r.start_token or token < r.end_token)):
-                token_range = r
-                break
-        
-        if not token_range:
-            return 0.0
-        
-        # Impact is based on range size and current imbalance
-        range_size_factor = token_range.size / self.TOKEN_SPACE
-        
-        from_node_tokens = self.stats['nodes'][from_node]['token_count']
-        to_node_tokens = self.stats['nodes'][to_node]['token_count']
-        ideal_tokens = self.total_tokens / self.n_nodes
-        
-        # Calculate how much this movement improves balance
-        from_deviation_before = abs(from_node_tokens - ideal_tokens)
-        from_deviation_after = abs((from_node_tokens - 1) - ideal_tokens)
-        
-        to_deviation_before = abs(to_node_tokens - ideal_tokens)
-        to_deviation_after = abs((to_node_tokens + 1) - ideal_tokens)
+        n = len(values)
+        if k <= 0:
+            return np.empty(0, dtype=np.intp)
+        if k < n:
+            # Partition out the k-th largest value and keep everything tied
+            # with it, so the stable sort below decides which ties make the cut
+            kth = np.partition(values, n - k)[n - k]
+            positions = np.flatnonzero(values >= kth)
+        else:
+            positions = np.arange(n)
+        return positions[np.argsort(-values[positions], kind='stable')[:k]]
+    
+    def _balance_improvements(self, from_idx: np.ndarray, to_idx: np.ndarray) -> np.ndarray:
+        """
+        Reduction in total absolute deviation from moving one token from each
+        node in from_idx (rows) to each node in to_idx (columns).
+        """
+        ideal_tokens = self._ideal_tokens
+        from_counts = self._counts[from_idx].astype(np.float64)[:, None]
+        to_counts = self._counts[to_idx].astype(np.float64)[None, :]
+        return ((np.abs(from_counts - ideal_tokens) + np.abs(to_counts - ideal_tokens))
+                - (np.abs((from_counts - 1) - ideal_tokens) + np.abs((to_counts + 1) - ideal_tokens)))
+    
+    def _find_ranges(self, tokens: np.ndarray) -> np.ndarray:
+        """
+        Find the range containing each token, handling wrap-around.
         
-        improvement = (from_deviation_before + to_deviation_before) - (from_deviation_after + to_deviation_after)
+        Returns:
+            Indices into the sorted range arrays, -1 where no range contains
+            the token
+        """
+        n_ranges = len(self._range_starts)
+        if not n_ranges:
+            return np.full(len(tokens), -1, dtype=np.intp)
         
-        # Combine factors
-        impact_score = improvement * (1 + range_size_factor * 10)
+        # The last range starting at or before each token is the only one
+        # that can contain it; before the first start, that is the last
+        # range, which wraps around
+        idx = (np.searchsorted(self._range_starts, tokens, side='right') - 1) % n_ranges
+        found = tokens.view(np.uint64) - self._range_starts[idx].view(np.uint64) < self._range_spans[idx]
         
-        return impact_score
+        return np.where(found, idx, -1)
     
     def estimate_rebalancing_cost(self, movements: List[TokenMovement]) -> Dict:
         """
@@ -267,17 +370,13 @@ class RebalancingAdvisor:
         Returns:
             Dictionary containing cost estimates
         """
-        # Calculate data movement (simplified estimation)
-        total_data_movement = 0
-        
-        for movement in movements:
-            # Find the range size for this token
-            for r in self.ranges:
-                if r.start_token <= movement.token_value < r.end_token:
-                    # Estimate data size based on range size and total load
-                    range_percentage = r.size / self.TOKEN_SPACE
-                    total_data_movement += range_percentage
-                    break
+        soa = movements_to_soa(movements, self.node_index)
+        
+        # Calculate data movement (simplified estimation): each token's range
+        # share of the token space
+        range_idx = self._find_ranges(soa['token_value'])
+        moved_size = float(self._range_sizes[range_idx[range_idx >= 0]].sum(dtype=np.float64))
+        total_data_movement = moved_size * self._INV_TOKEN_SPACE
         
         # Estimate time (very rough - depends on network, data size, etc.)
         # Assume 100 MB/s transfer rate and average 1 TB per node
@@ -287,19 +386,16 @@ class RebalancingAdvisor:
         # Calculate expected balance improvement
         current_balance = self.stats['balance_score']
         
-        # Simulate the movements
-        simulated_token_counts = {node: self.stats['nodes'][node]['token_count'] 
-                                 for node in self.nodes}
-        
-        for movement in movements:
-            simulated_token_counts[movement.from_node] -= 1
-            simulated_token_counts[movement.to_node] += 1
+        # Simulate the movements on the per-node count array
+        simulated_token_counts = self._counts.copy()
+        np.subtract.at(simulated_token_counts, soa['from_idx'], 1)
+        np.add.at(simulated_token_counts, soa['to_idx'], 1)
         
         # Calculate new balance score
-        ideal_tokens = self.total_tokens / self.n_nodes
-        deviations = [abs(count - ideal_tokens) for count in simulated_token_counts.values()]
-        mean_deviation = np.mean(deviations)
-        std_deviation = np.std(deviations)
+        ideal_tokens = self._ideal_tokens
+        deviations = np.abs(simulated_token_counts - ideal_tokens)
+        centered = deviations - deviations.sum() / self.n_nodes
+        std_deviation = np.sqrt((centered * centered).sum() / self.n_nodes)
         cv = std_deviation / ideal_tokens if ideal_tokens > 0 else 0
         estimated_new_balance = max(0, 1.0 - cv)
         
@@ -378,6 +474,7 @@ def print_rebalancing_report(advisor: RebalancingAdvisor):
 if __name__ == '__main__':
     import argparse
     import json
+    import sys
     
     parser = argparse.ArgumentParser(
         description='Analyze ring balance and provide rebalancing recommendations'
@@ -391,7 +488,11 @@ if __name__ == '__main__':
     
     # Parse and analyze ring
     ring_parser = RingParser(args.ring_file)
-    tokens = ring_parser.parse_file()
+    try:
+        tokens = ring_parser.parse_file()
+    except (OSError, ValueError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
     
     analyzer = TokenAnalyzer(tokens)
     ranges = analyzer.calculate_ranges()
@@ -409,27 +510,23 @@ if __name__ == '__main__':
         movements = advisor.suggest_token_movements(max_movements=args.max_movements)
         cost = advisor.estimate_rebalancing_cost(movements)
         
+        # Exported fields, fetched per object by a single attrgetter call;
+        # movements export their token value under 'token'
+        recommendation_keys = ('node', 'current_tokens', 'recommended_tokens', 'change',
+                               'priority', 'reason')
+        recommendation_values = operator.attrgetter(*recommendation_keys)
+        movement_keys = ('token', 'from_node', 'to_node', 'impact_score')
+        movement_values = operator.attrgetter('token_value', 'from_node', 'to_node', 'impact_score')
+        
         export_data = {
             'analysis': analysis,
             'recommendations': [
-                {
-                    'node': r.node,
-                    'current_tokens': r.current_tokens,
-                    'recommended_tokens': r.recommended_tokens,
-                    'change': r.change,
-                    'priority': r.priority,
-                    'reason': r.reason
-                }
-                for r in recommendations
+                dict(zip(recommendation_keys, values))
+                for values in map(recommendation_values, recommendations)
             ],
             'suggested_movements': [
-                {
-                    'token': m.token_value,
-                    'from_node': m.from_node,
-                    'to_node': m.to_node,
-                    'impact_score': m.impact_score
-                }
-                for m in movements
+                dict(zip(movement_keys, values))
+                for values in map(movement_values, movements)
             ],
             'cost_estimate': cost
         }
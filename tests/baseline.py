@@ -0,0 +1,396 @@
+"""
+Reference implementations for the regression tests.
+Plain-Python copies of the analysis code as it was before the NumPy and
+numba rewrites, with plotting left out. Only documented behaviour changes
+are applied on top; each is marked where it happens.
+"""
+
+from datetime import datetime
+from typing import Dict, List
+
+import numpy as np
+
+from cassandra_ring_analyzer import TokenEntry, TokenRange
+from rebalancing_advisor import TokenMovement
+
+
+class TokenAnalyzer:
+    """Analyzes token distribution and detects gaps."""
+
+    TOKEN_SPACE = 2**64
+
+    def __init__(self, tokens: List[TokenEntry]):
+        self.tokens = tokens
+        self.sorted_tokens = sorted(tokens, key=lambda t: t.token)
+
+    def calculate_ranges(self) -> List[TokenRange]:
+        ranges = []
+        n = len(self.sorted_tokens)
+        for i in range(n):
+            current = self.sorted_tokens[i]
+            next_token = self.sorted_tokens[(i + 1) % n]
+            ranges.append(TokenRange(
+                start_token=current.token,
+                end_token=next_token.token,
+                owner=next_token.address,
+                size=self._calculate_range_size(current.token, next_token.token),
+                is_gap=False
+            ))
+        return ranges
+
+    def _calculate_range_size(self, start: int, end: int) -> int:
+        if end >= start:
+            return end - start
+        return (self.TOKEN_SPACE + end - start) % self.TOKEN_SPACE
+
+    def detect_gaps(self, ranges: List[TokenRange]) -> List[TokenRange]:
+        tokens_by_owner = {}
+        for token in self.tokens:
+            tokens_by_owner.setdefault(token.address, []).append(token.token)
+
+        gap_threshold = self.TOKEN_SPACE / len(self.tokens) * 2
+        for range_obj in ranges:
+            if range_obj.size > gap_threshold:
+                has_intermediate_tokens = any(
+                    self._is_token_in_range(token, range_obj.start_token, range_obj.end_token)
+                    for owner, owner_tokens in tokens_by_owner.items()
+                    if owner != range_obj.owner
+                    for token in owner_tokens
+                )
+                if not has_intermediate_tokens:
+                    range_obj.is_gap = True
+        return ranges
+
+    def _is_token_in_range(self, token: int, start: int, end: int) -> bool:
+        if end >= start:
+            return start < token < end
+        return token > start or token < end
+
+    def calculate_statistics(self, ranges: List[TokenRange]) -> Dict:
+        stats = {
+            'datacenter': None,
+            'total_tokens': len(self.tokens),
+            'total_ranges': len(ranges),
+            'nodes': {},
+            'gap_count': 0,
+            'gap_percentage': 0.0,
+            'balance_score': 0.0,
+            'largest_gap': 0,
+            'smallest_range': float('inf'),
+            'average_range': 0
+        }
+
+        for token in self.tokens:
+            node = token.address
+            if node not in stats['nodes']:
+                stats['nodes'][node] = {
+                    'token_count': 0,
+                    'load': token.load,
+                    'total_range_size': 0,
+                    'coverage_percentage': 0.0
+                }
+            stats['nodes'][node]['token_count'] += 1
+
+        gap_space = 0
+        range_sizes = []
+        for range_obj in ranges:
+            if range_obj.is_gap:
+                stats['gap_count'] += 1
+                gap_space += range_obj.size
+                stats['largest_gap'] = max(stats['largest_gap'], range_obj.size)
+            else:
+                stats['nodes'][range_obj.owner]['total_range_size'] += range_obj.size
+                range_sizes.append(range_obj.size)
+                stats['smallest_range'] = min(stats['smallest_range'], range_obj.size)
+
+        stats['gap_percentage'] = (gap_space / self.TOKEN_SPACE) * 100
+        for node_stats in stats['nodes'].values():
+            node_stats['coverage_percentage'] = (node_stats['total_range_size'] / self.TOKEN_SPACE) * 100
+
+        if range_sizes:
+            stats['average_range'] = sum(range_sizes) / len(range_sizes)
+
+        if range_sizes and len(range_sizes) > 1:
+            mean_size = stats['average_range']
+            variance = sum((x - mean_size)**2 for x in range_sizes) / len(range_sizes)
+            cv = variance ** 0.5 / mean_size if mean_size > 0 else 0
+            stats['balance_score'] = max(0, 1.0 - cv)
+        else:
+            stats['balance_score'] = 1.0
+
+        return stats
+
+
+def analyze(tokens: List[TokenEntry]):
+    """Ranges with gaps marked, and statistics, as every CLI computed them."""
+    analyzer = TokenAnalyzer(tokens)
+    ranges = analyzer.detect_gaps(analyzer.calculate_ranges())
+    return ranges, analyzer.calculate_statistics(ranges)
+
+
+class RebalancingAdvisor:
+    """Analyzes ring balance and provides rebalancing recommendations."""
+
+    TOKEN_SPACE = 2**64
+
+    def __init__(self, tokens: List[TokenEntry], ranges: List[TokenRange], stats: Dict):
+        self.tokens = tokens
+        self.ranges = ranges
+        self.stats = stats
+        self.nodes = list(stats['nodes'].keys())
+        self.n_nodes = len(self.nodes)
+        self.total_tokens = len(tokens)
+
+    def analyze_balance(self) -> Dict:
+        analysis = {
+            'balance_score': self.stats['balance_score'],
+            'is_balanced': self.stats['balance_score'] >= 0.9,
+            'imbalance_severity': self._calculate_imbalance_severity(),
+            'node_analysis': {},
+            'recommendations': []
+        }
+
+        ideal_tokens_per_node = self.total_tokens / self.n_nodes
+        for node in self.nodes:
+            current_tokens = self.stats['nodes'][node]['token_count']
+            deviation = current_tokens - ideal_tokens_per_node
+            deviation_pct = (deviation / ideal_tokens_per_node) * 100
+            analysis['node_analysis'][node] = {
+                'current_tokens': current_tokens,
+                'ideal_tokens': ideal_tokens_per_node,
+                'deviation': deviation,
+                'deviation_percentage': deviation_pct,
+                'status': self._classify_node_balance(deviation_pct)
+            }
+        return analysis
+
+    def _calculate_imbalance_severity(self) -> str:
+        balance_score = self.stats['balance_score']
+        if balance_score >= 0.95:
+            return 'excellent'
+        elif balance_score >= 0.9:
+            return 'good'
+        elif balance_score >= 0.8:
+            return 'fair'
+        elif balance_score >= 0.7:
+            return 'poor'
+        return 'critical'
+
+    def _classify_node_balance(self, deviation_pct: float) -> str:
+        abs_dev = abs(deviation_pct)
+        if abs_dev <= 5:
+            return 'balanced'
+        elif abs_dev <= 10:
+            return 'slightly_imbalanced'
+        elif abs_dev <= 20:
+            return 'imbalanced'
+        return 'severely_imbalanced'
+
+    def generate_recommendations(self) -> List[Dict]:
+        """Recommendations as dicts, reason included."""
+        recommendations = []
+        analysis = self.analyze_balance()
+        if analysis['is_balanced']:
+            return recommendations
+
+        ideal_tokens = self.total_tokens / self.n_nodes
+        for node, node_analysis in analysis['node_analysis'].items():
+            deviation = node_analysis['deviation']
+            deviation_pct = node_analysis['deviation_percentage']
+            if node_analysis['status'] == 'balanced':
+                continue
+
+            if abs(deviation_pct) > 20:
+                priority = 'high'
+            elif abs(deviation_pct) > 10:
+                priority = 'medium'
+            else:
+                priority = 'low'
+
+            if deviation > 0:
+                reason = f"Node has {abs(deviation):.1f} more tokens than ideal ({abs(deviation_pct):.1f}% over). Consider removing tokens."
+            else:
+                reason = f"Node has {abs(deviation):.1f} fewer tokens than ideal ({abs(deviation_pct):.1f}% under). Consider adding tokens."
+
+            recommendations.append({
+                'node': node,
+                'current_tokens': node_analysis['current_tokens'],
+                'recommended_tokens': int(round(ideal_tokens)),
+                'change': int(round(ideal_tokens - node_analysis['current_tokens'])),
+                'priority': priority,
+                'reason': reason
+            })
+
+        priority_order = {'high': 0, 'medium': 1, 'low': 2}
+        recommendations.sort(key=lambda r: (priority_order[r['priority']], abs(r['change'])),
+                             reverse=True)
+        return recommendations
+
+    def suggest_token_movements(self, max_movements: int = 10) -> List[TokenMovement]:
+        movements = []
+        analysis = self.analyze_balance()
+
+        over_allocated = []
+        under_allocated = []
+        for node, node_analysis in analysis['node_analysis'].items():
+            if node_analysis['deviation'] > 0:
+                over_allocated.append((node, node_analysis['deviation']))
+            elif node_analysis['deviation'] < 0:
+                under_allocated.append((node, abs(node_analysis['deviation'])))
+        over_allocated.sort(key=lambda x: x[1], reverse=True)
+        under_allocated.sort(key=lambda x: x[1], reverse=True)
+
+        for from_node, _ in over_allocated:
+            node_tokens = sorted([t.token for t in self.tokens if t.address == from_node])
+            for to_node, _ in under_allocated:
+                if len(movements) >= max_movements:
+                    break
+                if node_tokens:
+                    token_to_move = node_tokens[len(node_tokens) // 2]
+                    movements.append(TokenMovement(
+                        token_value=token_to_move,
+                        from_node=from_node,
+                        to_node=to_node,
+                        impact_score=self._calculate_movement_impact(token_to_move, from_node, to_node)
+                    ))
+                    node_tokens.remove(token_to_move)
+            if len(movements) >= max_movements:
+                break
+
+        movements.sort(key=lambda m: m.impact_score, reverse=True)
+        return movements[:max_movements]
+
+    def _find_range(self, token: int):
+        for r in self.ranges:
+            if r.start_token <= token < r.end_token or (r.end_token < r.start_token and (token >= r.start_token or token < r.end_token)):
+                return r
+        return None
+
+    def _calculate_movement_impact(self, token: int, from_node: str, to_node: str) -> float:
+        token_range = self._find_range(token)
+        if not token_range:
+            return 0.0
+
+        range_size_factor = token_range.size / self.TOKEN_SPACE
+        from_node_tokens = self.stats['nodes'][from_node]['token_count']
+        to_node_tokens = self.stats['nodes'][to_node]['token_count']
+        ideal_tokens = self.total_tokens / self.n_nodes
+
+        improvement = ((abs(from_node_tokens - ideal_tokens) + abs(to_node_tokens - ideal_tokens))
+                       - (abs((from_node_tokens - 1) - ideal_tokens) + abs((to_node_tokens + 1) - ideal_tokens)))
+        return improvement * (1 + range_size_factor * 10)
+
+    def estimate_rebalancing_cost(self, movements: List[TokenMovement]) -> Dict:
+        total_data_movement = 0
+        for movement in movements:
+            # Documented change: the wrap-around range counts too, where the
+            # original scan (r.start_token <= token < r.end_token) skipped it
+            r = self._find_range(movement.token_value)
+            if r is not None:
+                total_data_movement += r.size / self.TOKEN_SPACE
+
+        estimated_data_gb = total_data_movement * 1000
+        estimated_time_minutes = (estimated_data_gb / 100) * 60 / 1000
+        current_balance = self.stats['balance_score']
+
+        simulated_token_counts = {node: self.stats['nodes'][node]['token_count']
+                                  for node in self.nodes}
+        for movement in movements:
+            simulated_token_counts[movement.from_node] -= 1
+            simulated_token_counts[movement.to_node] += 1
+
+        ideal_tokens = self.total_tokens / self.n_nodes
+        deviations = [abs(count - ideal_tokens) for count in simulated_token_counts.values()]
+        std_deviation = np.std(deviations)
+        cv = std_deviation / ideal_tokens if ideal_tokens > 0 else 0
+        estimated_new_balance = max(0, 1.0 - cv)
+        balance_improvement = estimated_new_balance - current_balance
+
+        return {
+            'number_of_movements': len(movements),
+            'estimated_data_movement_gb': estimated_data_gb,
+            'estimated_time_minutes': estimated_time_minutes,
+            'current_balance_score': current_balance,
+            'estimated_new_balance_score': estimated_new_balance,
+            'balance_improvement': balance_improvement,
+            'improvement_percentage': (balance_improvement / current_balance) * 100 if current_balance > 0 else 0
+        }
+
+
+def print_multi_dc_statistics(datacenters: Dict[str, Dict]):
+    """Multi-DC report, taking each DC's statistics by name."""
+    print("\n" + "="*70)
+    print("MULTI-DATACENTER RING ANALYSIS")
+    print("="*70)
+    print(f"Total Datacenters: {len(datacenters)}\n")
+
+    for dc_name, stats in datacenters.items():
+        print(f"\n{'─'*70}")
+        print(f"Datacenter: {dc_name}")
+        print(f"{'─'*70}")
+        print(f"Total Nodes: {len(stats.get('nodes', {}))}")
+        print(f"Total Tokens: {stats.get('total_tokens', 0)}")
+
+        print("\nNode Distribution:")
+        for node in sorted(stats.get('nodes', {}).keys()):
+            node_stats = stats['nodes'][node]
+            print(f"  {node}: {node_stats['token_count']} tokens "
+                  f"({node_stats['coverage_percentage']:.2f}%) - Load: {node_stats['load']}")
+
+        print(f"\nToken Space Coverage:")
+        total_coverage = sum(n['coverage_percentage'] for n in stats.get('nodes', {}).values())
+        print(f"  Owned: {total_coverage:.2f}%")
+        print(f"  Gaps: {stats.get('gap_percentage', 0):.2f}% "
+              f"({stats.get('gap_count', 0)} gaps detected)")
+
+        print(f"\nBalance Score: {stats.get('balance_score', 0):.3f} (1.0 = perfect balance)")
+
+    print("\n" + "="*70 + "\n")
+
+
+def compare_snapshots(timestamp1: datetime, tokens1: List[TokenEntry], stats1: Dict,
+                      timestamp2: datetime, tokens2: List[TokenEntry], stats2: Dict) -> Dict:
+    """HistoricalAnalyzer.compare_snapshots on two analyzed snapshots."""
+    nodes1 = set(t.address for t in tokens1)
+    nodes2 = set(t.address for t in tokens2)
+    common_nodes = nodes1 & nodes2
+
+    token_changes = {}
+    for node in common_nodes:
+        before = len([t for t in tokens1 if t.address == node])
+        after = len([t for t in tokens2 if t.address == node])
+        if before != after:
+            token_changes[node] = {'before': before, 'after': after, 'change': after - before}
+
+    return {
+        'timestamp1': timestamp1,
+        'timestamp2': timestamp2,
+        'time_delta': timestamp2 - timestamp1,
+        'nodes_added': list(nodes2 - nodes1),
+        'nodes_removed': list(nodes1 - nodes2),
+        'nodes_unchanged': list(common_nodes),
+        'token_changes': token_changes,
+        'total_tokens_before': len(tokens1),
+        'total_tokens_after': len(tokens2),
+        'balance_score_before': stats1['balance_score'],
+        'balance_score_after': stats2['balance_score'],
+        'balance_change': stats2['balance_score'] - stats1['balance_score'],
+        'gaps_before': stats1['gap_count'],
+        'gaps_after': stats2['gap_count'],
+        'gap_change': stats2['gap_count'] - stats1['gap_count'],
+        'gap_pct_change': stats2['gap_percentage'] - stats1['gap_percentage']
+    }
+
+
+def export_comparison(comparison: Dict) -> Dict:
+    """The JSON document export_comparison wrote, before serialization."""
+    export_data = comparison.copy()
+    export_data['timestamp1'] = comparison['timestamp1'].isoformat()
+    export_data['timestamp2'] = comparison['timestamp2'].isoformat()
+    export_data['time_delta'] = str(comparison['time_delta'])
+    return export_data
+
+
+def trend_label(values: List, up: str, down: str) -> str:
+    """Trend label as detect_trends chose it from the first and last values."""
+    return up if values[-1] > values[0] else down if values[-1] < values[0] else 'stable'
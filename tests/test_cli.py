@@ -0,0 +1,86 @@
+"""
+Tests for the command-line entry points.
+Unreadable or token-less ring files must end in a one-line error on stderr
+and exit status 1, not a traceback.
+"""
+
+import importlib.util
+import os
+import subprocess
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Script, extra arguments and the optional packages it needs
+CLIS = [
+    ('cassandra_ring_analyzer.py', ['--stats-only'], ['matplotlib']),
+    ('rebalancing_advisor.py', [], []),
+    ('interactive_visualizer.py', [], ['plotly']),
+    ('interactive_visualizer.py', ['--dashboard'], ['plotly']),
+]
+
+NO_TOKENS = (
+    "Datacenter: dc1\n"
+    "==========\n"
+    "Address    Rack   Status State   Load        Owns    Token\n"
+    "\n"
+)
+
+
+def run_cli(script, args, cwd):
+    """Run a CLI script with HOME in cwd, so no user cache is touched."""
+    env = dict(os.environ, HOME=str(cwd), MPLBACKEND='Agg')
+    return subprocess.run([sys.executable, os.path.join(ROOT, script)] + args,
+                          cwd=cwd, env=env, capture_output=True, text=True, timeout=300)
+
+
+def require(modules):
+    for module in modules:
+        if importlib.util.find_spec(module) is None:
+            pytest.skip(f"{module} is not installed")
+
+
+def assert_clean_error(result):
+    assert result.returncode == 1
+    assert 'Traceback' not in result.stderr
+    assert result.stderr.startswith('Error: ')
+
+
+@pytest.fixture
+def no_tokens_file(tmp_path):
+    path = tmp_path / 'empty_ring.txt'
+    path.write_text(NO_TOKENS)
+    return str(path)
+
+
+@pytest.mark.parametrize('script, args, needs', CLIS, ids=lambda v: v if isinstance(v, str) else None)
+def test_missing_file(tmp_path, script, args, needs):
+    require(needs)
+    result = run_cli(script, [str(tmp_path / 'missing.txt')] + args, tmp_path)
+    assert_clean_error(result)
+    assert 'not found' in result.stderr
+
+
+@pytest.mark.parametrize('script, args, needs', CLIS, ids=lambda v: v if isinstance(v, str) else None)
+def test_no_tokens(tmp_path, no_tokens_file, script, args, needs):
+    require(needs)
+    result = run_cli(script, [no_tokens_file] + args, tmp_path)
+    assert_clean_error(result)
+    assert 'No valid tokens' in result.stderr
+
+
+def test_historical_missing_file(tmp_path):
+    require(['matplotlib'])
+    missing = str(tmp_path / 'missing.txt')
+    result = run_cli('historical_analyzer.py', [missing, missing], tmp_path)
+    assert_clean_error(result)
+    assert 'not found' in result.stderr
+
+
+def test_historical_no_tokens(tmp_path, no_tokens_file):
+    require(['matplotlib'])
+    result = run_cli('historical_analyzer.py', [no_tokens_file, no_tokens_file], tmp_path)
+    assert_clean_error(result)
+    assert 'No valid tokens' in result.stderr
@@ -0,0 +1,244 @@
+"""
+Tests for numba_utils.
+Every kernel is checked against a plain-Python version of the logic it
+replaced, on random rings, both as compiled with numba (when installed) and
+as its NumPy fallback.
+"""
+
+import importlib.util
+import math
+import os
+import random
+import statistics
+import sys
+
+import numpy as np
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+TOKEN_SPACE = 2**64
+MIN_TOKEN = -(2**63)
+MAX_TOKEN = 2**63 - 1
+
+# Ring sizes to test: a single token, two tokens, then random sizes
+RING_SIZES = [1, 2, 3, 17, 250]
+SEEDS = range(5)
+
+
+def _load_numba_utils(with_numba: bool):
+    """Import numba_utils with numba, or a separate copy without it."""
+    if with_numba:
+        pytest.importorskip('numba')
+        # Imported under its own name: numba's on-disk cache records the
+        # module name, so compiling under an alias would break later imports
+        import numba_utils
+        return numba_utils
+    
+    saved = sys.modules.get('numba')
+    # A None entry makes "import numba" raise ImportError
+    sys.modules['numba'] = None
+    try:
+        spec = importlib.util.spec_from_file_location('numba_utils_numpy',
+                                                      os.path.join(ROOT, 'numba_utils.py'))
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+    finally:
+        if saved is None:
+            sys.modules.pop('numba', None)
+        else:
+            sys.modules['numba'] = saved
+    assert not module.HAVE_NUMBA
+    return module
+
+
+@pytest.fixture(scope='module', params=[True, False], ids=['numba', 'numpy'])
+def nu(request):
+    return _load_numba_utils(request.param)
+
+
+def random_ring(rnd: random.Random, n: int):
+    """n distinct sorted tokens, sometimes including the token-space ends."""
+    tokens = set()
+    if n > 2 and rnd.random() < 0.5:
+        tokens.update((MIN_TOKEN, MAX_TOKEN))
+    while len(tokens) < n:
+        tokens.add(rnd.randint(MIN_TOKEN, MAX_TOKEN))
+    return sorted(tokens)
+
+
+def ring_ranges(tokens):
+    """(start, end) of each range between consecutive tokens; the last wraps."""
+    n = len(tokens)
+    return [(tokens[i], tokens[(i + 1) % n]) for i in range(n)]
+
+
+def range_arrays(ranges):
+    """Sorted starts, spans and sizes as the kernels take them."""
+    ranges = sorted(ranges)
+    starts = np.array([s for s, _ in ranges], dtype=np.int64)
+    spans = np.array([(e - s) % TOKEN_SPACE for s, e in ranges], dtype=np.uint64)
+    return starts, spans, spans.copy()
+
+
+def find_range(ranges, token):
+    """Baseline containment check, including the wrap-around range."""
+    for i, (start, end) in enumerate(sorted(ranges)):
+        if start <= token < end or (end < start and (token >= start or token < end)):
+            return i
+    return -1
+
+
+def query_tokens(rnd: random.Random, tokens):
+    """Random tokens plus every ring token, its neighbours and the space ends."""
+    queries = [rnd.randint(MIN_TOKEN, MAX_TOKEN) for _ in range(50)]
+    queries += tokens + [MIN_TOKEN, MAX_TOKEN]
+    queries += [t + 1 for t in tokens if t < MAX_TOKEN] + [t - 1 for t in tokens if t > MIN_TOKEN]
+    return queries
+
+
+def test_compute_range_sizes(nu):
+    for seed in SEEDS:
+        rnd = random.Random(seed)
+        for n in RING_SIZES:
+            tokens = random_ring(rnd, n)
+            expected = [(e - s) % TOKEN_SPACE for s, e in ring_ranges(tokens)]
+            sizes = nu.compute_range_sizes(np.array(tokens, dtype=np.int64))
+            assert sizes.dtype == np.uint64
+            assert sizes.tolist() == expected
+
+
+def test_mean_std(nu):
+    for seed in SEEDS:
+        rnd = random.Random(seed)
+        for n in RING_SIZES:
+            sizes = [(e - s) % TOKEN_SPACE for s, e in ring_ranges(random_ring(rnd, n))]
+            mean, std = nu.mean_std(np.array(sizes, dtype=np.uint64))
+            floats = [float(s) for s in sizes]
+            assert mean == pytest.approx(statistics.fmean(floats), rel=1e-12)
+            assert std == pytest.approx(statistics.pstdev(floats), rel=1e-9, abs=1e-3)
+
+
+def test_build_wedges(nu):
+    rnd = random.Random(0)
+    m = 40
+    starts = np.array([rnd.uniform(0, 360) for _ in range(m)])
+    spans = np.array([rnd.uniform(0.001, 90) for _ in range(m)])
+    n_points = np.array([rnd.randint(2, 30) for _ in range(m)], dtype=np.int64)
+    r_in, r_out = 0.6, 1.0
+
+    # Inner arc, outer arc reversed, first inner point again, NaN separator
+    expected_x, expected_y = [], []
+    for start, span, n in zip(starts.tolist(), spans.tolist(), n_points.tolist()):
+        angles = [math.radians(start + span * k / (n - 1)) for k in range(n)]
+        points = [(r_in * math.cos(a), r_in * math.sin(a)) for a in angles]
+        points += [(r_out * math.cos(a), r_out * math.sin(a)) for a in reversed(angles)]
+        points += [points[0], (math.nan, math.nan)]
+        expected_x += [p[0] for p in points]
+        expected_y += [p[1] for p in points]
+
+    x, y = nu.build_wedges(starts, spans, n_points, r_in, r_out)
+    np.testing.assert_allclose(x, expected_x, rtol=1e-9, atol=1e-12)
+    np.testing.assert_allclose(y, expected_y, rtol=1e-9, atol=1e-12)
+
+
+def test_range_buckets(nu):
+    for seed in SEEDS:
+        rnd = random.Random(seed)
+        for n in RING_SIZES:
+            starts = np.array(random_ring(rnd, n), dtype=np.int64)
+            grid = nu.range_buckets(starts)
+            for token in query_tokens(rnd, starts.tolist()):
+                b = nu.token_bucket(token)
+                assert 0 <= b < 1 << nu.BUCKET_BITS
+                # The last start at or before the token lies within the bucket's bounds
+                last = int(np.searchsorted(starts, token, side='right')) - 1
+                assert grid[b] <= last <= grid[b + 1]
+
+
+def _ring_cases(rnd: random.Random):
+    """Ranges of a full ring, and of the same ring with one range missing."""
+    for n in RING_SIZES:
+        ranges = ring_ranges(random_ring(rnd, n))
+        yield ranges
+        if n > 2:
+            del ranges[rnd.randrange(n)]
+            yield ranges
+
+
+def test_movement_impacts(nu):
+    for seed in SEEDS:
+        rnd = random.Random(seed)
+        for ranges in _ring_cases(rnd):
+            starts, spans, sizes = range_arrays(ranges)
+            grid = nu.range_buckets(starts)
+            queries = query_tokens(rnd, [s for s, _ in ranges])
+            improvements = [rnd.uniform(-2, 2) for _ in queries]
+
+            expected = []
+            for token, improvement in zip(queries, improvements):
+                idx = find_range(ranges, token)
+                size_factor = int(sizes[idx]) / TOKEN_SPACE
+                expected.append(improvement * (1 + size_factor * 10) if idx >= 0 else 0.0)
+
+            scores = nu.movement_impacts(np.array(queries, dtype=np.int64), np.array(improvements),
+                                         starts, spans, sizes, grid)
+            assert scores.tolist() == pytest.approx(expected, rel=1e-12)
+
+
+def _baseline_candidates(node_tokens, sources, n_sinks, k):
+    """The original suggestion loop: middle token of what remains, per sink."""
+    candidates = []
+    for row, source in enumerate(sources):
+        remaining = list(node_tokens[source])
+        for column in range(n_sinks):
+            if len(candidates) >= k:
+                break
+            if remaining:
+                middle = len(remaining) // 2
+                candidates.append((remaining[middle], row, column))
+                del remaining[middle]
+        if len(candidates) >= k:
+            break
+    return candidates
+
+
+def test_suggest_movements(nu):
+    for seed in SEEDS:
+        rnd = random.Random(seed)
+        for ranges in _ring_cases(rnd):
+            ring_tokens = [s for s, _ in ranges]
+            starts, spans, sizes = range_arrays(ranges)
+            grid = nu.range_buckets(starts)
+
+            # Deal the tokens out to nodes; some tokens fall outside the ranges
+            n_nodes = rnd.randint(1, 8)
+            tokens = ring_tokens + [rnd.randint(MIN_TOKEN, MAX_TOKEN) for _ in range(5)]
+            node_tokens = [[] for _ in range(n_nodes)]
+            for token in tokens:
+                node_tokens[rnd.randrange(n_nodes)].append(token)
+            node_tokens = [sorted(t) for t in node_tokens]
+            offsets = np.zeros(n_nodes + 1, dtype=np.intp)
+            offsets[1:] = np.cumsum([len(t) for t in node_tokens])
+            flat = np.array([t for node in node_tokens for t in node], dtype=np.int64)
+
+            sources = rnd.sample(range(n_nodes), rnd.randint(0, n_nodes))
+            n_sinks = rnd.randint(0, 12)
+            improvements = np.array([[rnd.uniform(-2, 2) for _ in range(n_sinks)]
+                                     for _ in sources]).reshape(len(sources), n_sinks)
+
+            for k in (0, 1, 5, 60):
+                expected = _baseline_candidates(node_tokens, sources, n_sinks, k)
+                out_tokens, rows, columns, scores = nu.suggest_movements(
+                    flat, offsets, np.array(sources, dtype=np.intp), improvements, k,
+                    starts, spans, sizes, grid)
+                assert list(zip(out_tokens.tolist(), rows.tolist(), columns.tolist())) == expected
+
+                expected_scores = []
+                for token, row, column in expected:
+                    idx = find_range(ranges, token)
+                    size_factor = int(sizes[idx]) / TOKEN_SPACE
+                    expected_scores.append(improvements[row, column] * (1 + size_factor * 10)
+                                           if idx >= 0 else 0.0)
+                assert scores.tolist() == pytest.approx(expected_scores, rel=1e-12)
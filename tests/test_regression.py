@@ -0,0 +1,206 @@
+"""
+Regression tests against the original analysis code.
+Statistics, rebalancing advice, the multi-DC report and comparison export
+are checked against the plain-Python reference in baseline.py on random
+rings, including duplicate tokens and the ends of the token space.
+"""
+
+import json
+import math
+import os
+import random
+import sys
+from datetime import datetime, timedelta
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import baseline
+from cassandra_ring_analyzer import TokenEntry, TokenAnalyzer
+from historical_analyzer import HistoricalAnalyzer, RingSnapshot, _BAL, _DIR, _trend_direction
+from multi_dc_analyzer import DatacenterInfo, MultiDCRingParser, print_multi_dc_statistics
+from rebalancing_advisor import RebalancingAdvisor, TokenMovement
+
+MIN_TOKEN = -(2**63)
+MAX_TOKEN = 2**63 - 1
+
+# Token counts to test: a single token, two tokens, then random sizes
+RING_SIZES = [1, 2, 3, 17, 250]
+SEEDS = range(5)
+
+
+def random_tokens(rnd: random.Random, n: int, prefix: str = '10.0.0'):
+    """
+    n token entries over a few nodes, in file order. Some values repeat and
+    some are the token-space ends; each node reports one load.
+    """
+    n_nodes = rnd.randint(1, 6)
+    nodes = [f"{prefix}.{i + 1}" for i in range(n_nodes)]
+    loads = {node: f"{rnd.uniform(1, 500):.2f} GiB" for node in nodes}
+    values = []
+    for _ in range(n):
+        pick = rnd.random()
+        if values and pick < 0.1:
+            values.append(rnd.choice(values))
+        elif pick < 0.15:
+            values.append(rnd.choice((MIN_TOKEN, MAX_TOKEN)))
+        else:
+            values.append(rnd.randint(MIN_TOKEN, MAX_TOKEN))
+    # Skew the owners so some nodes end up over and some under the ideal
+    weights = [rnd.uniform(0.2, 3) for _ in nodes]
+    owners = rnd.choices(nodes, weights, k=n)
+    return [TokenEntry(owner, 'rack1', 'Up', 'Normal', loads[owner], '', value)
+            for owner, value in zip(owners, values)]
+
+
+def rings():
+    for seed in SEEDS:
+        rnd = random.Random(seed)
+        for n in RING_SIZES:
+            yield rnd, random_tokens(rnd, n)
+
+
+def analyze(tokens):
+    analyzer = TokenAnalyzer(tokens)
+    ranges = analyzer.detect_gaps(analyzer.calculate_ranges())
+    return ranges, analyzer.calculate_statistics(ranges)
+
+
+def assert_close(actual, expected):
+    """Equal structure and values, floats to within rounding."""
+    if isinstance(expected, dict):
+        assert list(actual) == list(expected)
+        for key in expected:
+            assert_close(actual[key], expected[key])
+    elif isinstance(expected, (list, tuple)):
+        assert len(actual) == len(expected)
+        for a, e in zip(actual, expected):
+            assert_close(a, e)
+    elif isinstance(expected, float):
+        assert actual == pytest.approx(expected, rel=1e-9, abs=1e-12)
+    else:
+        assert actual == expected
+
+
+def test_calculate_statistics():
+    for _, tokens in rings():
+        expected_ranges, expected = baseline.analyze(tokens)
+        ranges, stats = analyze(tokens)
+        assert ranges == expected_ranges
+        assert_close({key: stats[key] for key in expected}, expected)
+
+
+def advisors(tokens):
+    """The current advisor and the reference one for a ring."""
+    return (RebalancingAdvisor(tokens, *analyze(tokens)),
+            baseline.RebalancingAdvisor(tokens, *baseline.analyze(tokens)))
+
+
+def test_analyze_balance():
+    for _, tokens in rings():
+        advisor, expected = advisors(tokens)
+        assert_close(advisor.analyze_balance(), expected.analyze_balance())
+
+
+def test_generate_recommendations():
+    for _, tokens in rings():
+        advisor, expected = advisors(tokens)
+        recommendations = [
+            {'node': r.node, 'current_tokens': r.current_tokens,
+             'recommended_tokens': r.recommended_tokens, 'change': r.change,
+             'priority': r.priority, 'reason': r.reason}
+            for r in advisor.generate_recommendations()
+        ]
+        assert recommendations == expected.generate_recommendations()
+
+
+def test_suggest_token_movements():
+    for _, tokens in rings():
+        advisor, expected = advisors(tokens)
+        for max_movements in (0, 1, 3, 10, 50):
+            movements = advisor.suggest_token_movements(max_movements)
+            expected_movements = expected.suggest_token_movements(max_movements)
+            assert ([(m.token_value, m.from_node, m.to_node) for m in movements]
+                    == [(m.token_value, m.from_node, m.to_node) for m in expected_movements])
+            assert_close([m.impact_score for m in movements],
+                         [m.impact_score for m in expected_movements])
+
+
+def test_estimate_rebalancing_cost():
+    for rnd, tokens in rings():
+        advisor, expected = advisors(tokens)
+        # Suggested movements plus random ones, tokens off the ring included
+        movements = expected.suggest_token_movements(20)
+        for _ in range(10):
+            movements.append(TokenMovement(
+                token_value=rnd.choice((rnd.choice(tokens).token,
+                                        rnd.randint(MIN_TOKEN, MAX_TOKEN), MIN_TOKEN, MAX_TOKEN)),
+                from_node=rnd.choice(advisor.nodes),
+                to_node=rnd.choice(advisor.nodes),
+                impact_score=0.0
+            ))
+        for count in (0, 1, len(movements)):
+            assert_close(advisor.estimate_rebalancing_cost(movements[:count]),
+                         expected.estimate_rebalancing_cost(movements[:count]))
+
+
+def test_multi_dc_report(capsys):
+    for seed in SEEDS:
+        rnd = random.Random(seed)
+        names = [f"dc{i + 1}" for i in range(rnd.randint(1, 4))]
+        dc_tokens = {name: random_tokens(rnd, rnd.choice(RING_SIZES), f"10.{i}.0")
+                     for i, name in enumerate(names)}
+        # An empty DC is reported but never analyzed
+        if seed % 2:
+            dc_tokens['empty'] = []
+
+        parser = MultiDCRingParser('unused')
+        parser.datacenters = {name: DatacenterInfo(name=name, tokens=list(tokens))
+                              for name, tokens in dc_tokens.items()}
+        print_multi_dc_statistics(parser.analyze_all_datacenters(max_workers=1))
+        report = capsys.readouterr().out
+
+        baseline.print_multi_dc_statistics(
+            {name: baseline.analyze(tokens)[1] if tokens else {}
+             for name, tokens in dc_tokens.items()})
+        assert report == capsys.readouterr().out
+
+
+def test_export_comparison(tmp_path):
+    for seed in SEEDS:
+        rnd = random.Random(seed)
+        start = datetime(2024, 1, 1) + timedelta(seconds=rnd.randint(0, 10**7))
+        timestamps = [start, start + timedelta(hours=rnd.randint(1, 1000), microseconds=seed)]
+        ring_tokens = [random_tokens(rnd, rnd.choice(RING_SIZES)) for _ in timestamps]
+
+        analyzer = HistoricalAnalyzer()
+        analyzer.snapshots = [RingSnapshot(timestamp=ts, filepath='', datacenter='dc1',
+                                           tokens=tokens)
+                              for ts, tokens in zip(timestamps, ring_tokens)]
+        path = tmp_path / f"comparison_{seed}.json"
+        analyzer.export_comparison(analyzer.compare_snapshots(0, 1), str(path))
+        with open(path) as f:
+            exported = json.load(f)
+
+        expected = baseline.compare_snapshots(
+            timestamps[0], ring_tokens[0], baseline.analyze(ring_tokens[0])[1],
+            timestamps[1], ring_tokens[1], baseline.analyze(ring_tokens[1])[1])
+        expected = json.loads(json.dumps(baseline.export_comparison(expected)))
+
+        # Node lists and token changes come from sets, so only their
+        # contents are fixed, not their order
+        for key in ('nodes_added', 'nodes_removed', 'nodes_unchanged'):
+            assert sorted(exported.pop(key)) == sorted(expected.pop(key))
+        assert exported.pop('token_changes') == expected.pop('token_changes')
+        assert_close(exported, expected)
+
+
+@pytest.mark.parametrize('values', [
+    [1, 2, 3], [3, 2, 1], [5, 9, 5], [7], [0.5, 0.25], [math.nan, 1.0], [1.0, math.nan],
+])
+def test_trend_direction(values):
+    assert _DIR[_trend_direction(values) + 1] == baseline.trend_label(values, 'increasing', 'decreasing')
+    assert _BAL[_trend_direction(values) + 1] == baseline.trend_label(values, 'improving', 'degrading')